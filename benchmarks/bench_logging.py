@@ -0,0 +1,192 @@
+"""Micro benchmarks for the SCLogging hot paths
+
+Run from the repository root:
+
+    python benchmarks/bench_logging.py [--number N]
+
+Each line prints the cost per call in microseconds (best of five runs),
+except the console line sizes, which are in bytes.
+Log files are written to a temporary directory.
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+os.environ.setdefault(
+    "DYNACONF_LOGGING_PATH", tempfile.mkdtemp(prefix="sclogging-bench-")
+)
+
+import coloredlogs as cl  # noqa: E402
+
+from sclogging import sclogging_main as scl  # noqa: E402
+from sclogging.handlers import BatchFileHandler  # noqa: E402
+
+PLAIN_MESSAGE = "Loaded 42 rows from the cache in 3 ms"
+TAGGED_MESSAGE = (
+    "Loaded %f.cyan%42%f% rows from %s.bright%the cache%s% in %b.red%3 ms%b%"
+)
+
+
+def report(label: str, seconds: float, number: int) -> None:
+    """Print the cost of one call"""
+    print(f"{label:<44} {seconds / number * 1e6:8.3f} us")
+
+
+def make_record(message: str, level: int = logging.INFO) -> logging.LogRecord:
+    """Record with message, INFO unless level is given"""
+    return logging.LogRecord(
+        "bench", level, __file__, 1, message, None, None, func="bench"
+    )
+
+
+def best(statement, number: int) -> float:
+    """Best total time of five runs"""
+    return min(timeit.repeat(statement, number=number, repeat=5))
+
+
+def bench_console_rendering(number: int) -> None:
+    """Console message rendering through the markup cache and level table"""
+    for label, message in (("plain", PLAIN_MESSAGE), ("tagged", TAGGED_MESSAGE)):
+        record = make_record(message)
+
+        def render():
+            record.__dict__.pop("console_fields", None)
+            scl.render_console_fields(record)
+
+        report(f"render_console_fields ({label})", best(render, number), number)
+        report(
+            f"render_style_markup ({label}, cached)",
+            best(lambda: scl.render_style_markup(message), number),
+            number,
+        )
+
+
+def bench_level_filters(number: int) -> None:
+    """NameFilter.filter() and console rendering at each level"""
+    name_filter = scl.NameFilter()
+    for level_name in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+        record = make_record(TAGGED_MESSAGE, logging.getLevelName(level_name))
+
+        def filter_and_render():
+            record.funcName = "bench"
+            record.__dict__.pop("console_fields", None)
+            name_filter.filter(record)
+            scl.render_console_fields(record)
+
+        report(
+            f"filter() + console fields ({level_name})",
+            best(filter_and_render, number),
+            number,
+        )
+
+
+def per_character_spacer(length: int) -> str:
+    """Old spacer, with the color code before every character"""
+    return (scl.spacer_color + scl.spacer) * length if length > 0 else ""
+
+
+def bench_spacer(number: int) -> None:
+    """Cached colored spacer runs and the bytes they save per console line"""
+    spacer_time = best(lambda: scl.render_spacer(60), number)
+    report("render_spacer (cached run)", spacer_time, number)
+    report(
+        "per-character spacer (old)",
+        best(lambda: per_character_spacer(60), number),
+        number,
+    )
+
+    formatter = scl.ConsoleFormatter(
+        cl.ColoredFormatter(fmt=scl.console_log_format)
+    )
+    saved = (scl.render_spacer, scl.plain_console)
+    scl.plain_console = False
+    try:
+        for label, spacer_function in (
+            ("per-character", per_character_spacer),
+            ("single run", saved[0]),
+        ):
+            scl.render_spacer = spacer_function
+            scl.clear_spacer_cache()
+            line = formatter.format(make_record(TAGGED_MESSAGE))
+            line_label = f"console line, {label} spacer"
+            print(f"{line_label:<44} {len(line.encode()):5d} bytes")
+    finally:
+        scl.render_spacer, scl.plain_console = saved
+        scl.clear_spacer_cache()
+
+
+def bench_file_handlers(number: int) -> None:
+    """Batched versus plain file writes"""
+    directory = tempfile.mkdtemp(prefix="sclogging-bench-files-")
+    record = make_record(PLAIN_MESSAGE)
+    handlers = (
+        (
+            "logging.FileHandler",
+            logging.FileHandler(os.path.join(directory, "plain.log")),
+        ),
+        (
+            "BatchFileHandler (64KiB batches)",
+            BatchFileHandler(os.path.join(directory, "batch.log"), batch_bytes=65536),
+        ),
+    )
+    for label, handler in handlers:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        handle_time = best(lambda: handler.handle(record), number)
+        report(f"{label} handle()", handle_time, number)
+        handler.close()
+        if isinstance(handler, BatchFileHandler):
+            print(f"{'':<44} {handler.writes} writes for {number * 5} records")
+
+
+def bench_get_logger(number: int) -> None:
+    """get_logger() for a registered name and for a new name"""
+    report(
+        "get_logger() (registered)",
+        best(lambda: scl.get_logger("bench_registered"), number),
+        number,
+    )
+    names = itertools.count()
+    first_calls = max(number // 100, 10)
+    report(
+        "get_logger() (new name)",
+        best(lambda: scl.get_logger(f"bench_new_{next(names)}"), first_calls),
+        first_calls,
+    )
+
+
+def bench_timers(number: int) -> None:
+    """Timer creation and a Timer.timed call with its level disabled"""
+    report("Timer() creation", best(lambda: scl.Timer("DEBUG"), number), number)
+
+    @scl.Timer.timed("NOTSET")
+    def disabled():
+        return None
+
+    def plain():
+        return None
+
+    report("plain function call", best(plain, number), number)
+    report("Timer.timed call, level disabled", best(disabled, number), number)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="Calls per run")
+    args = parser.parse_args()
+
+    bench_console_rendering(args.number)
+    bench_level_filters(args.number)
+    bench_spacer(args.number)
+    bench_file_handlers(args.number)
+    bench_get_logger(args.number)
+    bench_timers(args.number)
+
+
+if __name__ == "__main__":
+    main()
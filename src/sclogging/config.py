@@ -10,6 +10,7 @@
 #  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 # *****************************************************************************
 
+import tomllib
 from os.path import dirname, exists, join
 
 from dynaconf import Dynaconf, Validator, loaders
@@ -26,17 +27,84 @@ if exists(settings_file):
         Validator(
             "logging_auto_create_dir",
             "logging_log_to_file",
+            "logging_async_file",
+            "logging_shared_file",
+            "logging_timer_aggregate",
+            "logging_timer_span_tree",
+            "logging_trace_file",
+            "logging_timer_calibrate",
+            "logging_timer_baseline",
             is_type_of=bool,
         ),
+        Validator(
+            "logging_queue_size",
+            is_type_of=int,
+            gt=0,
+        ),
         Validator(
             "logging_path",
             "logging_ext",
+            "logging_batch_flush_level",
             "spacer",
             "spacer_color",
             is_type_of=str,
         ),
+        Validator(
+            "logging_queue_policy",
+            is_in=["block", "drop_oldest", "drop_newest", "sample"],
+        ),
+        Validator(
+            "logging_queue_sample_rate",
+            is_type_of=int,
+            gt=0,
+        ),
+        Validator(
+            "logging_drop_report_interval",
+            is_type_of=(int, float),
+            gt=0,
+        ),
+        Validator(
+            "logging_max_open_files",
+            is_type_of=int,
+            gt=0,
+        ),
+        Validator(
+            "logging_rotate_bytes",
+            "logging_rotate_seconds",
+            "logging_backup_count",
+            "logging_max_total_bytes",
+            "logging_trace_max_bytes",
+            is_type_of=int,
+            gte=0,
+        ),
+        Validator(
+            "logging_compression",
+            is_in=["gzip", "zstd", "none"],
+        ),
+        Validator(
+            "logging_batch_bytes",
+            is_type_of=int,
+            gte=0,
+        ),
+        Validator(
+            "logging_batch_ms",
+            is_type_of=(int, float),
+            gt=0,
+        ),
+        Validator(
+            "logging_timer_summary_interval",
+            "logging_timer_watchdog_seconds",
+            "logging_timer_regression_threshold",
+            is_type_of=(int, float),
+            gte=0,
+        ),
+        Validator(
+            "logging_color_mode",
+            is_in=["auto", "always", "never"],
+        ),
         Validator(
             "specific_loggers",
+            "queue_level_policies",
             is_type_of=dict,
         ),
     )
@@ -47,5 +115,13 @@ else:
 
 
 def write_config(config_data: dict) -> None:
-    """Writes config to file"""
-    loaders.write(settings_file, DynaBox(config_data).to_dict())
+    """Writes config to file
+
+    Keys that config_data does not set keep their current value in the file.
+    """
+    merged_data = {}
+    if exists(settings_file):
+        with open(settings_file, "rb") as config_file:
+            merged_data = tomllib.load(config_file)
+    merged_data.update(config_data)
+    loaders.write(settings_file, DynaBox(merged_data).to_dict())
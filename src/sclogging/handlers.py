@@ -0,0 +1,803 @@
+"""File handlers used by get_logger"""
+
+# *****************************************************************************
+#  MIT License                                                                *
+#                                                                             *
+#  Copyright (c) 2025 sshimek42                                               *
+#                                                                             *
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the "Software"), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#  The above copyright notice and this permission notice (including the next paragraph) shall be included in all copies or substantial portions of the Software.
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+# *****************************************************************************
+
+import atexit
+import functools
+import glob
+import gzip
+import logging
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+QUEUE_POLICIES = ("block", "drop_oldest", "drop_newest", "sample")
+COMPRESSION_TYPES = ("gzip", "zstd", "none")
+
+fork_handlers = weakref.WeakSet()
+
+
+def reset_handlers_after_fork() -> None:
+    """Let handlers with background threads restart them in a forked child
+
+    Only the forking thread survives fork(), so a child would otherwise queue
+    records for threads that no longer exist.
+    """
+    for handler in list(fork_handlers):
+        handler.after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_handlers_after_fork)
+
+
+def copy_record(record: logging.LogRecord) -> logging.LogRecord:
+    """
+    Shallow copy of a record
+
+    Lets another thread format the record while the console handler is
+    still working on the original.
+
+    :param record: Record to copy
+    :return: Copy
+    :rtype: logging.LogRecord
+    """
+    record_copy = record.__class__.__new__(record.__class__)
+    record_copy.__dict__.update(record.__dict__)
+    return record_copy
+
+
+class LogCompressor:
+    """Background thread that compresses rotated logs and applies retention"""
+
+    def __init__(self) -> None:
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, segment: str, rotator: "LogRotator") -> None:
+        """
+        Queue a rotated segment
+
+        :param segment: Path of the rotated file
+        :param rotator: Rotation settings of the file it came from
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="sclogging-compressor", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.stop)
+        self.queue.put((segment, rotator))
+
+    def _run(self) -> None:
+        """Compressor thread loop"""
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                segment, rotator = item
+                try:
+                    rotator.compress(segment)
+                finally:
+                    rotator.finish(segment)
+                rotator.apply_retention()
+            except OSError as error:
+                logging.getLogger(__name__).warning(
+                    f"Log rotation failed - {error}")
+            finally:
+                self.queue.task_done()
+
+    def stop(self) -> None:
+        """Finish queued work and stop the thread"""
+        with self._lock:
+            if self._thread is None:
+                return
+            self.queue.put(None)
+            self._thread.join()
+            self._thread = None
+            atexit.unregister(self.stop)
+
+
+log_compressor = LogCompressor()
+
+
+class LogRotator:
+    """Size and wall-clock rotation settings for one log file
+
+    Rotation renames the file on the logging thread. Compression and pruning
+    happen on the shared compressor thread.
+
+    Segments are named <file>.<sequence>-<time>. The sequence continues from
+    the segments already on disk, so names and retention order stay
+    chronological even when the clock or file times do not. Segments still
+    waiting for compression are left out of retention.
+    """
+
+    def __init__(
+        self,
+        base_filename: str,
+        max_bytes: int = 0,
+        interval: float = 0,
+        backup_count: int = 0,
+        max_total_bytes: int = 0,
+        compression: str = "gzip",
+    ) -> None:
+        self.base_filename = base_filename
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.max_total_bytes = max_total_bytes
+        if compression == "zstd" and zstd is None:
+            compression = "gzip"
+        self.compression = compression
+        self.next_rotation = self._next_rotation(time.time())
+        self.segment_pattern = re.compile(re.escape(self.base_filename) + r"\.(\d+)-")
+        self.pending = set()
+        self._lock = threading.Lock()
+        self.sequence = max(
+            (self.segment_sequence(path) for path in self._segment_paths()), default=0
+        )
+
+    def _next_rotation(self, now: float) -> float:
+        """Next multiple of interval in local wall-clock time"""
+        if not self.interval:
+            return float("inf")
+        utc_offset = time.localtime(now).tm_gmtoff
+        periods = (now + utc_offset) // self.interval + 1
+        return periods * self.interval - utc_offset
+
+    def should_rotate(self, size: int) -> bool:
+        """
+        Check if the file is due for rotation
+
+        :param size: Current file size
+        :return: True to rotate
+        :rtype: bool
+        """
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        return time.time() >= self.next_rotation
+
+    def rotate(self) -> None:
+        """Rename the current file and queue it for compression"""
+        now = time.time()
+        self.next_rotation = self._next_rotation(now)
+        if not os.path.exists(self.base_filename):
+            return
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+        with self._lock:
+            self.sequence += 1
+            segment = f"{self.base_filename}.{self.sequence:06d}-{stamp}"
+            self.pending.add(segment)
+        os.replace(self.base_filename, segment)
+        log_compressor.submit(segment, self)
+
+    def compress(self, segment: str) -> None:
+        """
+        Compress a rotated segment and remove the original
+
+        :param segment: Path of the rotated file
+        """
+        if self.compression == "gzip":
+            opener, suffix = gzip.open, ".gz"
+        elif self.compression == "zstd":
+            opener, suffix = zstd.open, ".zst"
+        else:
+            return
+        with open(segment, "rb") as source, opener(segment + suffix, "wb") as dest:
+            shutil.copyfileobj(source, dest)
+        os.remove(segment)
+
+    def finish(self, segment: str) -> None:
+        """
+        Mark a rotated segment as done, making it subject to retention
+
+        :param segment: Path of the rotated file
+        """
+        with self._lock:
+            self.pending.discard(segment)
+
+    def segment_sequence(self, path: str) -> int:
+        """
+        Rotation sequence of a segment
+
+        :param path: Segment path
+        :return: Sequence, -1 for segments without one
+        :rtype: int
+        """
+        match = self.segment_pattern.match(path)
+        return int(match.group(1)) if match else -1
+
+    def _segment_paths(self) -> list:
+        """All rotated files of this log"""
+        return glob.glob(glob.escape(self.base_filename) + ".*")
+
+    def segments(self) -> list:
+        """Rotated files of this log, oldest first, without pending compression"""
+        with self._lock:
+            pending = {
+                path
+                for segment in self.pending
+                for path in (segment, f"{segment}.gz", f"{segment}.zst")
+            }
+        paths = [path for path in self._segment_paths() if path not in pending]
+        return sorted(paths, key=lambda path: (self.segment_sequence(path), path))
+
+    def apply_retention(self) -> None:
+        """Remove the oldest segments beyond backup_count or max_total_bytes"""
+        segments = self.segments()
+        if self.backup_count:
+            while len(segments) > self.backup_count:
+                os.remove(segments.pop(0))
+        if self.max_total_bytes:
+            sizes = [os.path.getsize(segment) for segment in segments]
+            while segments and sum(sizes) > self.max_total_bytes:
+                os.remove(segments.pop(0))
+                sizes.pop(0)
+
+
+class BatchFileHandler(logging.Handler):
+    """File handler that batches encoded records into one write
+
+    Records are encoded into a reusable buffer. The buffer is written with a
+    single os.write when it reaches batch_bytes, batch_ms after the first
+    buffered record, or right away for records at flush_level and above.
+    With batch_bytes of 0 every record is written on its own.
+
+    Time based flushes come from one flusher thread per handler, started with
+    the first batched record. It sleeps on a condition of the handler lock
+    until a batch has a deadline. A forked child starts its own flusher.
+
+    If a LogRotator is given the file is rotated before a write once it is
+    due.
+    """
+
+    def __init__(
+        self,
+        filename: str | os.PathLike,
+        mode: str = "a",
+        encoding: str = "utf-8",
+        batch_bytes: int = 65536,
+        batch_ms: float = 200,
+        flush_level: int = logging.ERROR,
+        rotator: LogRotator = None,
+    ) -> None:
+        super().__init__()
+        self.baseFilename = os.path.abspath(filename)
+        self.rotator = rotator
+        self.size = 0
+        self.mode = mode
+        self.encoding = encoding
+        self.terminator = "\n"
+        self.batch_bytes = batch_bytes
+        self.batch_seconds = batch_ms / 1000
+        self.flush_level = flush_level
+        self.buffer = bytearray()
+        self.writes = 0
+        self._flush_deadline = None
+        self._flush_wakeup = threading.Condition(self.lock)
+        self._flusher = None
+        self._closing = False
+        self.fd = self._open()
+        fork_handlers.add(self)
+
+    def after_fork(self) -> None:
+        """Let a forked child start its own flusher thread
+
+        Records batched before the fork are written by the parent.
+        """
+        del self.buffer[:]
+        self._flush_deadline = None
+        self._flush_wakeup = threading.Condition(self.lock)
+        self._flusher = None
+
+    def _open(self) -> int:
+        """Open the log file for appending (or truncating with mode "w")"""
+        flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        flags |= os.O_TRUNC if self.mode == "w" else os.O_APPEND
+        fd = os.open(self.baseFilename, flags, 0o644)
+        self.mode = "a"
+        self.size = os.fstat(fd).st_size
+        return fd
+
+    def _rotate(self) -> None:
+        """Close, rotate and reopen the file, caller holds the lock"""
+        if self.fd is not None:
+            os.close(self.fd)
+        self.rotator.rotate()
+        self.fd = self._open()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Add record to the batch
+
+        :param record: Record to write
+        """
+        try:
+            line = self.format(record) + self.terminator
+            self.buffer += line.encode(self.encoding, "backslashreplace")
+            if (
+                record.levelno >= self.flush_level
+                or len(self.buffer) >= self.batch_bytes
+            ):
+                self._write_buffer()
+            elif self._flush_deadline is None:
+                self._flush_deadline = time.monotonic() + self.batch_seconds
+                if self._flusher is None:
+                    self._flusher = threading.Thread(
+                        target=self._run_flusher, name="sclogging-batch", daemon=True
+                    )
+                    self._flusher.start()
+                else:
+                    self._flush_wakeup.notify()
+        except Exception:
+            self.handleError(record)
+
+    def _run_flusher(self) -> None:
+        """Flusher thread loop, writes each batch when its deadline passes"""
+        with self._flush_wakeup:
+            while not self._closing:
+                if self._flush_deadline is None:
+                    self._flush_wakeup.wait()
+                    continue
+                remaining = self._flush_deadline - time.monotonic()
+                if remaining > 0:
+                    self._flush_wakeup.wait(remaining)
+                    continue
+                try:
+                    self._write_buffer()
+                except OSError as error:
+                    logging.getLogger(__name__).warning(
+                        f"Batch write failed - {error}")
+
+    def _write_buffer(self) -> None:
+        """Write the batch to the file, caller holds the lock"""
+        self._flush_deadline = None
+        if not self.buffer:
+            return
+        if self.fd is None:
+            self.fd = self._open()
+        if self.rotator is not None and self.rotator.should_rotate(self.size):
+            self._rotate()
+        view = memoryview(self.buffer)
+        try:
+            while view:
+                written = os.write(self.fd, view)
+                self.writes += 1
+                self.size += written
+                view = view[written:]
+        finally:
+            view.release()
+            del self.buffer[:]
+
+    def flush(self) -> None:
+        """Write any batched records"""
+        with self.lock:
+            self._write_buffer()
+
+    def release_file(self) -> None:
+        """Write remaining records and close the file descriptor
+
+        The file is reopened by the next write. Not named release(), which is
+        the lock API of logging.Handler.
+        """
+        with self.lock:
+            self._write_buffer()
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+
+    def close(self) -> None:
+        """Write remaining records, stop the flusher and close the file
+
+        The flusher is not joined: logging.shutdown() calls close() with the
+        handler lock held, and the flusher needs that lock to wake up.
+        """
+        self.release_file()
+        with self._flush_wakeup:
+            self._closing = True
+            self._flusher = None
+            self._flush_wakeup.notify()
+        super().close()
+
+
+class RecordQueue(queue.Queue):
+    """Bounded queue that can replace its oldest droppable record"""
+
+    def put_replacing_oldest(self, item: tuple) -> bool:
+        """
+        Drop the oldest record below ERROR and append item
+
+        :param item: (enqueue_ns, record) to add
+        :return: False if every queued record is ERROR or above
+        :rtype: bool
+        """
+        with self.mutex:
+            for index, queued in enumerate(self.queue):
+                if queued is not None and queued[1].levelno < logging.ERROR:
+                    del self.queue[index]
+                    self.queue.append(item)
+                    self.not_empty.notify()
+                    return True
+        return False
+
+
+class AsyncFileHandler(logging.Handler):
+    """Queues records for a background writer thread
+
+    The calling thread only copies the record and puts it on a bounded queue.
+    Formatting and file I/O happen in the writer thread, which drains the
+    queue on close and at exit.
+
+    When the queue is full the policy decides what happens: block the caller,
+    drop the oldest record, drop the new record, or keep one record in
+    sample_rate. ERROR and above always block rather than drop. level_policies
+    maps level names to a policy that overrides the default. Dropped counts
+    are written to the file as a WARNING every report_interval seconds.
+    """
+
+    def __init__(
+        self,
+        target: logging.Handler,
+        queue_size: int = 10000,
+        policy: str = "block",
+        level_policies: dict = None,
+        sample_rate: int = 10,
+        report_interval: float = 60,
+    ) -> None:
+        super().__init__(target.level)
+        self.target = target
+        self.queue = RecordQueue(queue_size)
+        self.policy = policy
+        self.level_policies = dict(level_policies or {})
+        self.sample_rate = max(int(sample_rate), 1)
+        self.report_interval = report_interval
+        self.dropped = 0
+        self.sampled = 0
+        self._reported = (0, 0)
+        self._last_report = time.monotonic()
+        self._sample_count = 0
+        self.enqueued = 0
+        self.written = 0
+        self.enqueue_ns_total = 0
+        self.enqueue_ns_max = 0
+        self.writer_lag_ns = 0
+        self.writer_lag_ns_max = 0
+        self._closed = False
+        self._writer_thread = None
+        self._start_writer()
+        fork_handlers.add(self)
+        atexit.register(self.close)
+
+    def _start_writer(self) -> None:
+        """Start the writer thread"""
+        self._writer_thread = threading.Thread(
+            target=self._write_records, name="sclogging-writer", daemon=True
+        )
+        self._writer_thread.start()
+
+    def after_fork(self) -> None:
+        """Give a forked child its own queue and writer thread
+
+        Records queued before the fork are written by the parent.
+        """
+        self.queue = RecordQueue(self.queue.maxsize)
+        if not self._closed:
+            self._start_writer()
+
+    @property
+    def metrics(self) -> dict:
+        """
+        Queue and writer statistics
+
+        :return: queue_depth, enqueued, written, enqueue latency and writer lag
+        :rtype: dict
+        """
+        enqueue_ns_avg = self.enqueue_ns_total // self.enqueued if self.enqueued else 0
+        return {
+            "queue_depth": self.queue.qsize(),
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "sampled": self.sampled,
+            "written": self.written,
+            "enqueue_ns_avg": enqueue_ns_avg,
+            "enqueue_ns_max": self.enqueue_ns_max,
+            "writer_lag_ns": self.writer_lag_ns,
+            "writer_lag_ns_max": self.writer_lag_ns_max,
+        }
+
+    def setLevel(self, level: str | int) -> None:
+        """Set level on this handler and the wrapped handler"""
+        super().setLevel(level)
+        self.target.setLevel(level)
+
+    def setFormatter(self, fmt: logging.Formatter) -> None:
+        """Formatting happens in the writer thread, on the wrapped handler"""
+        self.target.setFormatter(fmt)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Queue record for the writer thread
+
+        :param record: Record to write
+        """
+        if self._closed:
+            self.target.handle(record)
+            return
+        start_ns = time.perf_counter_ns()
+        item = (start_ns, copy_record(record))
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            if not self._put_full(item):
+                return
+        enqueue_ns = time.perf_counter_ns() - start_ns
+        self.enqueued += 1
+        self.enqueue_ns_total += enqueue_ns
+        if enqueue_ns > self.enqueue_ns_max:
+            self.enqueue_ns_max = enqueue_ns
+
+    def policy_for(self, record: logging.LogRecord) -> str:
+        """
+        Backpressure policy for a record
+
+        :param record: Record being queued
+        :return: Policy name
+        :rtype: str
+        """
+        if record.levelno >= logging.ERROR:
+            return "block"
+        return self.level_policies.get(record.levelname, self.policy)
+
+    def _put_full(self, item: tuple) -> bool:
+        """
+        Apply the backpressure policy to a full queue
+
+        :param item: (enqueue_ns, record) to add
+        :return: True if the record was queued
+        :rtype: bool
+        """
+        policy = self.policy_for(item[1])
+        if policy == "drop_newest":
+            self.dropped += 1
+            return False
+        if policy == "drop_oldest":
+            if self.queue.put_replacing_oldest(item):
+                self.dropped += 1
+                return True
+        elif policy == "sample":
+            self._sample_count += 1
+            if self._sample_count % self.sample_rate:
+                self.sampled += 1
+                return False
+        self.queue.put(item)
+        return True
+
+    def _report_drops(self, force: bool = False) -> None:
+        """Write a summary record if records were dropped since the last one"""
+        now = time.monotonic()
+        if not force and now - self._last_report < self.report_interval:
+            return
+        self._last_report = now
+        dropped, sampled = self.dropped, self.sampled
+        new_dropped = dropped - self._reported[0]
+        new_sampled = sampled - self._reported[1]
+        if not new_dropped and not new_sampled:
+            return
+        self._reported = (dropped, sampled)
+        summary = logging.LogRecord(
+            "sclogging",
+            logging.WARNING,
+            __file__,
+            0,
+            f"{new_dropped} records dropped, {new_sampled} records sampled out "
+            f"- log queue full",
+            None,
+            None,
+            "AsyncFileHandler",
+        )
+        self.target.handle(summary)
+
+    def _write_records(self) -> None:
+        """Writer thread loop"""
+        while True:
+            try:
+                item = self.queue.get(timeout=self.report_interval)
+            except queue.Empty:
+                self._report_drops()
+                continue
+            try:
+                if item is None:
+                    self._report_drops(force=True)
+                    return
+                enqueue_ns, record = item
+                self.target.handle(record)
+                self.written += 1
+                self.writer_lag_ns = time.perf_counter_ns() - enqueue_ns
+                if self.writer_lag_ns > self.writer_lag_ns_max:
+                    self.writer_lag_ns_max = self.writer_lag_ns
+                if self.dropped or self.sampled:
+                    self._report_drops()
+            finally:
+                self.queue.task_done()
+
+    def flush(self) -> None:
+        """Wait for queued records to be written"""
+        if not self._closed:
+            self.queue.join()
+        self.target.flush()
+
+    def close(self) -> None:
+        """Drain the queue, stop the writer and close the file"""
+        with self.lock:
+            closing = not self._closed
+            if closing:
+                self._closed = True
+                self.queue.put(None)
+        if closing:
+            self._writer_thread.join()
+            atexit.unregister(self.close)
+            self.target.close()
+        super().close()
+
+
+def file_handler_of(handler: logging.Handler) -> logging.Handler:
+    """Handler that owns the file, unwrapping AsyncFileHandler"""
+    return getattr(handler, "target", handler)
+
+
+def file_is_open(handler: logging.Handler) -> bool:
+    """
+    Check if a file handler currently holds a file descriptor
+
+    :param handler: FileHandler, BatchFileHandler or AsyncFileHandler
+    :return: True if open
+    :rtype: bool
+    """
+    file_handler = file_handler_of(handler)
+    if isinstance(file_handler, BatchFileHandler):
+        return file_handler.fd is not None
+    return getattr(file_handler, "stream", None) is not None
+
+
+def release_file(handler: logging.Handler) -> None:
+    """
+    Close the file descriptor of a handler without closing the handler
+
+    FileHandler and BatchFileHandler both reopen the file on their next write.
+
+    :param handler: FileHandler, BatchFileHandler or AsyncFileHandler
+    """
+    file_handler = file_handler_of(handler)
+    if isinstance(file_handler, BatchFileHandler):
+        file_handler.release_file()
+    elif isinstance(file_handler, logging.FileHandler):
+        with file_handler.lock:
+            if file_handler.stream is not None:
+                file_handler.flush()
+                file_handler.stream.close()
+                file_handler.stream = None
+
+
+def replace_handler(old_handler: logging.Handler, new_handler: logging.Handler) -> None:
+    """
+    Swap a handler in every logger that has it
+
+    :param old_handler: Handler to remove
+    :param new_handler: Handler to add in its place
+    """
+    loggers = [logging.getLogger()] + [
+        each_logger
+        for each_logger in list(logging.Logger.manager.loggerDict.values())
+        if isinstance(each_logger, logging.Logger)
+    ]
+    for each_logger in loggers:
+        if old_handler in each_logger.handlers:
+            each_logger.removeHandler(old_handler)
+            each_logger.addHandler(new_handler)
+
+
+class FileHandlerPool:
+    """One handler per log file path
+
+    Loggers writing to the same path share a handler. At most max_open files
+    are kept open; the least recently used file is closed when another one
+    needs to open, and is reopened on its next record.
+
+    Each handler remembers the options it was built with. Asking for the same
+    path with other options replaces the handler in every logger using it.
+    """
+
+    def __init__(self, max_open: int = 64) -> None:
+        self.max_open = max(int(max_open), 1)
+        self.handlers = OrderedDict()
+        self.options = {}
+        self._lock = threading.RLock()
+
+    def get(
+        self, path: str | os.PathLike, factory, options: tuple = ()
+    ) -> logging.Handler:
+        """
+        Return the handler for path, creating it with factory(path) if needed
+
+        :param path: Log file path
+        :param factory: Callable that builds the handler
+        :param options: Options factory builds the handler with
+        :return: Shared handler
+        :rtype: logging.Handler
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            handler = self.handlers.get(path)
+            if handler is not None and self.options.get(path) != options:
+                old_handler = self.handlers.pop(path)
+                handler = self._create(path, factory, options)
+                replace_handler(old_handler, handler)
+                old_handler.close()
+            elif handler is None:
+                handler = self._create(path, factory, options)
+            else:
+                self.handlers.move_to_end(path)
+        return handler
+
+    def _create(self, path: str, factory, options: tuple) -> logging.Handler:
+        """Build and register the handler for path, caller holds the lock"""
+        self._make_room(path)
+        handler = factory(path)
+        handler.addFilter(functools.partial(self.touch, path))
+        self.handlers[path] = handler
+        self.options[path] = options
+        return handler
+
+    def touch(self, path: str, _record: logging.LogRecord) -> bool:
+        """
+        Handler filter that marks path as recently used
+
+        :param path: Log file path
+        :param _record: Record being handled
+        :return: Always True
+        :rtype: bool
+        """
+        with self._lock:
+            handler = self.handlers.get(path)
+            if handler is not None:
+                self.handlers.move_to_end(path)
+                if not file_is_open(handler):
+                    self._make_room(path)
+        return True
+
+    def _make_room(self, path: str) -> None:
+        """Close least recently used files until path can open"""
+        open_paths = [
+            each_path
+            for each_path, handler in self.handlers.items()
+            if each_path != path and file_is_open(handler)
+        ]
+        while len(open_paths) >= self.max_open:
+            release_file(self.handlers[open_paths.pop(0)])
+
+    def open_count(self) -> int:
+        """Number of pooled handlers holding a file descriptor"""
+        with self._lock:
+            return sum(1 for handler in self.handlers.values() if file_is_open(handler))
@@ -10,28 +10,148 @@
 #  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 # *****************************************************************************
 
+import atexit
 import difflib
-import inspect
+import functools
+import itertools
+import linecache
 import logging
 import os
 import re
 import shutil
+import signal
 import sys
+import threading
 import time
+import tracemalloc
 import types
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
+from typing import NamedTuple
+
+try:
+    import resource
+except ImportError:
+    resource = None
 
 import colorama as cr
 import coloredlogs as cl
 
 import pyinputplus as py_option
 from sclogging.config import settings, write_config
+from sclogging.handlers import (
+    COMPRESSION_TYPES,
+    QUEUE_POLICIES,
+    AsyncFileHandler,
+    BatchFileHandler,
+    FileHandlerPool,
+    LogRotator,
+)
+from sclogging.timer_baseline import (
+    Regression,
+    baseline_from_summaries,
+    compare_baselines,
+    load_baseline,
+    save_baseline,
+)
+from sclogging.timer_spans import close_span, format_span_tree, open_span
+from sclogging.timer_stats import (
+    format_duration,
+    format_metrics,
+    format_summary,
+    timer_stats,
+)
+from sclogging.timer_trace import TraceWriter
+from sclogging.timer_watchdog import TimerWatchdog, Watch
 
 # Constants for style tag processing
 STYLE_TAGS = {"f": "fore", "s": "style", "b": "back"}
-STYLE_TAG_PATTERN = r"%{tag}\.(\w*)%(.*?)%{tag}%"
-MESSAGE_TAG_STRIP_PATTERN = r"%\w.\w*%|%\w%"
+STYLE_TAG_TOKEN_PATTERN = re.compile(r"%([fsb])(?:\.(\w*))?%|\n")
+STYLE_MARKUP_CACHE_SIZE = 1024
+TIMER_CALLSITE_CACHE_SIZE = 1024
+ASSIGNMENT_TARGET_PATTERN = re.compile(
+    r"^(?:([\w.]+)\s*(?::[^=]*)?=(?!=)|(?:async\s+)?with\b.*\bas\s+(\w+))"
+)
+MESSAGE_TAG_STRIP_PATTERN = r"%[fsb]\.\w*%|%[fsb]%"
+MESSAGE_TAG_STRIPPER = re.compile(MESSAGE_TAG_STRIP_PATTERN)
+COLOR_MODES = ("auto", "always", "never")
+RESET_CODES = (cr.Fore.RESET, cr.Back.RESET, cr.Style.RESET_ALL)
+RESET_CODE_PATTERN = re.compile("|".join(re.escape(code) for code in RESET_CODES))
+
+
+class TerminalGeometry:
+    """Cached console width
+
+    shutil.get_terminal_size() is an ioctl/env lookup, so the width is read
+    once and only refreshed on SIGWINCH. Without a TTY the width stays at
+    FALLBACK_COLUMNS (or $COLUMNS).
+    """
+
+    FALLBACK_COLUMNS = 80
+
+    def __init__(self) -> None:
+        self.columns = self.FALLBACK_COLUMNS
+        self.is_tty = False
+        self.listeners = []
+        self._previous_handler = None
+        self.refresh()
+
+    def refresh(self) -> int:
+        """
+        Re-read console size
+
+        :return: columns
+        """
+        try:
+            self.is_tty = os.isatty(sys.__stdout__.fileno())
+        except (AttributeError, OSError, ValueError):
+            self.is_tty = False
+        self._set_columns(
+            shutil.get_terminal_size((self.FALLBACK_COLUMNS, 24)).columns)
+        return self.columns
+
+    def simulate_resize(self, columns: int) -> None:
+        """
+        Test hook, behaves like a SIGWINCH to the given width
+
+        :param columns: New width
+        """
+        self._set_columns(columns)
+
+    def _set_columns(self, columns: int) -> None:
+        """Store width and notify listeners if it changed"""
+        if columns == self.columns:
+            return
+        self.columns = columns
+        for listener in self.listeners:
+            listener()
+
+    def install(self) -> bool:
+        """
+        Refresh the width on SIGWINCH
+
+        Only possible on platforms with SIGWINCH and from the main thread.
+        Any existing handler is still called.
+
+        :return: True if the handler was installed
+        """
+        if not self.is_tty or not hasattr(signal, "SIGWINCH"):
+            return False
+        try:
+            self._previous_handler = signal.signal(
+                signal.SIGWINCH, self._on_resize)
+        except ValueError:
+            return False
+        return True
+
+    def _on_resize(self, signum, frame) -> None:
+        self.refresh()
+        if callable(self._previous_handler):
+            self._previous_handler(signum, frame)
+
+
+terminal = TerminalGeometry()
 
 
 def get_terminal_size() -> int:
@@ -40,8 +160,40 @@ def get_terminal_size() -> int:
 
     :return: columns
     """
-    columns = shutil.get_terminal_size().columns
-    return columns
+    return terminal.columns
+
+
+spacer_runs = {}
+
+
+def render_spacer(length: int) -> str:
+    """
+    Returns a colored spacer run
+
+    The color code is sent once for the whole run instead of before every
+    spacer character. Runs are cached by length.
+
+    :param length: Number of spacer characters
+    :return: Spacer string
+    """
+    if length <= 0:
+        return ""
+    run = spacer_runs.get(length)
+    if run is None:
+        if plain_console:
+            run = spacer * length
+        else:
+            run = spacer_color + spacer * length + cr.Fore.RESET
+        spacer_runs[length] = run
+    return run
+
+
+def clear_spacer_cache() -> None:
+    """Drop cached spacer runs after a width or spacer change"""
+    spacer_runs.clear()
+
+
+terminal.listeners.append(clear_spacer_cache)
 
 
 def __getattr__(name):
@@ -65,6 +217,21 @@ def __getattr__(name):
     return dup_dict.get(name)
 
 
+def fix_mod_path(caller_name: str) -> str:
+    """Get file name out of path
+
+    :param caller_name: Path to check
+    :return: Checked path
+    """
+    if ".py" in caller_name:
+        caller_name = Path(caller_name).name
+        caller_name = caller_name.replace(".py", "")
+        split_caller_name = caller_name.split(".")
+        if len(split_caller_name) > 1:
+            caller_name = split_caller_name[-2]
+    return caller_name
+
+
 class NameFilter(logging.Filter):
     """Class to add called variable to logger"""
 
@@ -74,62 +241,29 @@ class NameFilter(logging.Filter):
 
     @staticmethod
     def _prepare_record_metadata(record: logging.LogRecord) -> None:
-        """Prepare record name, function name, and add spacers."""
+        """Prepare record name and function name.
+
+        Colors, spacers and the file message are rendered later by the
+        handler formatters, only for handlers that emit the record.
+        """
         caller_exist = getattr(record, "caller", "")
         if not caller_exist:
             record.caller = ""
         record.name = fix_mod_path(record.name)
         if record.name != record.module:
             record.funcName = f"{record.module}.{record.funcName}"
-        term_c = get_terminal_size()
-        spacers = (spacer_color + spacer) * (term_c - len(record.funcName))
-        record.filefuncName = record.funcName
-        record.msg = str(record.msg)
-        record.filemessage = re.sub(MESSAGE_TAG_STRIP_PATTERN, "", record.msg)
-        record.funcName = f"{record.funcName} {spacers}"
 
     @staticmethod
-    def _extract_style_attributes(
-        message: str, level_name: str
-    ) -> tuple[str, str, str]:
+    def _resolve_level_emphasis(level_name: str) -> tuple[str, str]:
         """
-        Extract and apply style tags from message.
+        Resolve bold and faint styles for the given log level.
 
-        :return: Tuple of (formatted_message, bold_style, faint_style)
+        :return: Tuple of (bold_style, faint_style)
         """
-        fixed_text = message
-        curr_bold = ""
-        curr_faint = ""
-
-        each_attrib_count = 0
-        for style_search, style_name in STYLE_TAGS.items():
-            style_regex = STYLE_TAG_PATTERN.format(tag=style_search)
-            add_attrib = re.findall(style_regex, message)
-            if add_attrib:
-                for each_specific_attrib in add_attrib:
-                    attrib_add = each_specific_attrib[0]
-                    if attrib_add.upper() not in valid_attrib[each_attrib_count]:
-                        print(f"Invalid option specified - {attrib_add}")
-                        continue
-                    fixed_text = re.sub(
-                        style_regex,
-                        text_color(
-                            each_specific_attrib[1], attrib_add, style_name),
-                        fixed_text,
-                        count=1,
-                    )
-            each_attrib_count += 1
-            if style_search == "s":
-                curr_bold = error_color_format.get(
-                    level_name.lower()).get("bright", "")
-                if curr_bold:
-                    curr_bold = cr.Style.BRIGHT
-                curr_faint = error_color_format.get(
-                    level_name.lower()).get("faint", "")
-                if curr_faint:
-                    curr_faint = cr.Style.DIM
-
-        return fixed_text, curr_bold, curr_faint
+        level_format = error_color_format.get(level_name.lower(), {})
+        curr_bold = cr.Style.BRIGHT if level_format.get("bright", "") else ""
+        curr_faint = cr.Style.DIM if level_format.get("faint", "") else ""
+        return curr_bold, curr_faint
 
     @staticmethod
     def _resolve_level_colors(level_name: str) -> tuple[str, str]:
@@ -138,33 +272,21 @@ class NameFilter(logging.Filter):
 
         :return: Tuple of (foreground_color, background_color)
         """
-        curr_color = error_color_format.get(
-            level_name.lower()).get("color", "")
+        level_format = error_color_format.get(level_name.lower(), {})
+        curr_color = str(level_format.get("color", ""))
         if curr_color.isnumeric():
             curr_color = "\033[" + curr_color + "m"
         else:
             curr_color = getattr(cr.Fore, curr_color.upper(), "")
 
-        curr_back = error_color_format.get(
-            level_name.lower()).get("background", "")
+        curr_back = str(level_format.get("background", ""))
         if curr_back.isnumeric():
-            curr_back = "\033[" + curr_back
+            curr_back = "\033[" + curr_back + "m"
         else:
             curr_back = getattr(cr.Back, curr_back.upper(), "")
 
         return curr_color, curr_back
 
-    @staticmethod
-    def _apply_formatting(
-        text: str, fore_color: str, back_color: str, bold: str, faint: str
-    ) -> str:
-        """Apply final color and style formatting to text."""
-        curr_reset = back_color + fore_color + faint + bold
-        reset_text = curr_reset + text.replace(cr.Fore.RESET, fore_color)
-        reset_text = reset_text.replace(cr.Back.RESET, back_color)
-        reset_text = reset_text.replace(cr.Style.RESET_ALL, faint + bold)
-        return reset_text + curr_reset
-
     def filter(self, record: logging.LogRecord) -> bool:
         """
         Console filter
@@ -174,18 +296,193 @@ class NameFilter(logging.Filter):
         :rtype: bool
         """
         self._prepare_record_metadata(record)
+        return True
+
+
+class LevelStyle(NamedTuple):
+    """Precomputed console rendering for one log level
+
+    Resets inside a message are swapped for the level codes so the level
+    color carries on after an inline style tag closes.
+    """
 
-        fixed_text, curr_bold, curr_faint = self._extract_style_attributes(
-            record.msg, record.levelname
+    prefix: str
+    suffix: str
+    resets: dict
+
+    def apply(self, text: str) -> str:
+        """
+        Wrap text in the level colors
+
+        :param text: Message with ANSI codes already rendered
+        :return: Formatted message
+        :rtype: str
+        """
+        if "\033" in text:
+            text = RESET_CODE_PATTERN.sub(
+                lambda match: self.resets[match.group()], text)
+        return self.prefix + text + self.suffix
+
+
+PLAIN_LEVEL_STYLE = LevelStyle("", "", {code: code for code in RESET_CODES})
+
+
+def build_level_styles() -> dict:
+    """Rebuild the per-level rendering table from error_color_format
+
+    The table is replaced in one assignment so filters never see a partial
+    rebuild.
+
+    :return: Level name to LevelStyle
+    :rtype: dict
+    """
+    global level_styles
+
+    new_styles = {}
+    for level_name in error_color_format:
+        fore_color, back_color = NameFilter._resolve_level_colors(level_name)
+        bold, faint = NameFilter._resolve_level_emphasis(level_name)
+        curr_reset = back_color + fore_color + faint + bold
+        new_styles[level_name.upper()] = LevelStyle(
+            prefix=curr_reset,
+            suffix=curr_reset,
+            resets={
+                cr.Fore.RESET: fore_color,
+                cr.Back.RESET: back_color,
+                cr.Style.RESET_ALL: faint + bold,
+            },
         )
+    level_styles = new_styles
+    return level_styles
+
+
+def set_level_style(level_name: str, **level_format) -> None:
+    """Change console colors for a level
+
+    Accepts the same keys as error_color_format (color, background, bright,
+    faint) and rebuilds the level table.
+
+    :param level_name: Level to change
+    :param level_format: Style keys to update
+    """
+    error_color_format.setdefault(level_name.lower(), {}).update(level_format)
+    build_level_styles()
 
-        curr_color, curr_back = self._resolve_level_colors(record.levelname)
 
-        record.msg = self._apply_formatting(
-            fixed_text, curr_color, curr_back, curr_bold, curr_faint
+def render_console_fields(record: logging.LogRecord) -> tuple[str, str, str]:
+    """
+    Console message, function name and caller for a record
+
+    Built at most once per record and stored on it.
+
+    :param record: Record to render
+    :return: Tuple of (message, funcName, caller)
+    """
+    rendered = record.__dict__.get("console_fields")
+    if rendered is None:
+        message = str(record.msg)
+        if plain_console:
+            message = MESSAGE_TAG_STRIPPER.sub("", message)
+        else:
+            level_style = level_styles.get(record.levelname, PLAIN_LEVEL_STYLE)
+            message = level_style.apply(render_style_markup(message))
+        term_c = terminal.columns
+        func_name = record.funcName
+        caller = getattr(record, "caller", "")
+        rendered = (
+            message,
+            f"{func_name} {render_spacer(term_c - len(func_name))}",
+            f"{caller} {render_spacer(term_c - len(caller))}",
         )
+        record.console_fields = rendered
+    return rendered
 
-        return True
+
+def render_file_fields(record: logging.LogRecord) -> tuple[str, str]:
+    """
+    File function name and message for a record
+
+    Built at most once per record and stored on it.
+
+    :param record: Record to render
+    :return: Tuple of (filefuncName, filemessage)
+    """
+    rendered = record.__dict__.get("file_fields")
+    if rendered is None:
+        message = MESSAGE_TAG_STRIPPER.sub("", str(record.msg))
+        if record.args:
+            message = message % record.args
+        rendered = (getattr(record, "filefuncName", record.funcName), message)
+        record.file_fields = rendered
+    return rendered
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Wraps the coloredlogs formatter and renders console fields on demand"""
+
+    def __init__(self, formatter: logging.Formatter) -> None:
+        super().__init__()
+        self.formatter = formatter
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Format with console colors and spacers
+
+        The record is restored afterwards so other handlers see it unchanged.
+
+        :param record: Record to format
+        :return: Formatted line
+        :rtype: str
+        """
+        saved = (record.msg, record.funcName, getattr(record, "caller", ""))
+        record.msg, record.funcName, record.caller = render_console_fields(
+            record)
+        try:
+            return self.formatter.format(record)
+        finally:
+            record.msg, record.funcName, record.caller = saved
+
+
+class FileFormatter(logging.Formatter):
+    """File formatter that strips style tags on demand"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Format for log files
+
+        The record is restored afterwards so other handlers see it unchanged.
+
+        :param record: Record to format
+        :return: Formatted line
+        :rtype: str
+        """
+        record.filefuncName, record.filemessage = render_file_fields(record)
+        saved = (record.msg, record.args)
+        record.msg, record.args = record.filemessage, None
+        try:
+            return super().format(record)
+        finally:
+            record.msg, record.args = saved
+
+
+def install_console_handler(logger: logging.Logger, **install_options) -> None:
+    """
+    cl.install with lazy console rendering
+
+    coloredlogs may attach its handler to a parent logger, so the handler is
+    looked up in the propagation tree before wrapping its formatter.
+
+    :param logger: Logger to install on
+    :param install_options: Options passed to cl.install
+    """
+    cl.install(logger=logger, isatty=not plain_console, **install_options)
+    handler, _ = cl.find_handler(
+        logger,
+        lambda each_handler: cl.match_stream_handler(
+            each_handler, [sys.stdout, sys.stderr]),
+    )
+    if handler and not isinstance(handler.formatter, ConsoleFormatter):
+        handler.setFormatter(ConsoleFormatter(handler.formatter))
 
 
 base_log = logging.getLogger(__file__)
@@ -220,9 +517,15 @@ valid_attrib = [valid_colors, valid_styles, valid_back, valid_cursor]
 
 total_reset = cr.Fore.RESET + cr.Style.RESET_ALL + cr.Back.RESET
 
+STYLE_RESETS = {"f": cr.Fore.RESET, "s": cr.Style.RESET_ALL, "b": cr.Back.RESET}
+
 file_log_format = (
     r"%(asctime)s.%(msecs)03d,%(filefuncName)s,%(levelname)s,%(filemessage)s"
 )
+shared_file_log_format = (
+    r"%(asctime)s.%(msecs)03d,%(name)s,%(filefuncName)s,%(levelname)s,"
+    r"%(filemessage)s"
+)
 console_log_format = (
     r"%(asctime)s.%(msecs)03d %(name)-20s %(funcName)-60s "
     + " %(levelname)-10s %(message)-s"
@@ -249,6 +552,8 @@ error_color_format.update(
         "warning": {"color": "red"},
     }
 )
+level_styles = {}
+build_level_styles()
 
 default_log_path = ""
 default_level = "INFO"
@@ -256,6 +561,32 @@ default_file_level = "INFO"
 default_auto_create = False
 default_log_to_file = False
 default_log_ext = "log"
+default_color_mode = "auto"
+default_async_file = False
+default_queue_size = 10000
+default_queue_policy = "block"
+default_queue_level_policies = {}
+default_queue_sample_rate = 10
+default_drop_report_interval = 60
+default_batch_bytes = 0
+default_batch_ms = 200
+default_batch_flush_level = "ERROR"
+default_shared_file = False
+default_max_open_files = 64
+default_rotate_bytes = 0
+default_rotate_seconds = 0
+default_backup_count = 0
+default_max_total_bytes = 0
+default_compression = "gzip"
+default_timer_aggregate = False
+default_timer_summary_interval = 60
+default_timer_span_tree = False
+default_trace_file = False
+default_trace_max_bytes = 67108864
+default_timer_calibrate = False
+default_timer_watchdog_seconds = 0
+default_timer_baseline = False
+default_timer_regression_threshold = 0.2
 
 try:
     default_log_path = settings.logging_path
@@ -298,7 +629,86 @@ except AttributeError:
     base_log.critical(
         f"'logging_ext' missing in settings using {default_log_ext}")
 
-cl.install(logger=base_log)
+# Keys added after the original settings file are read with a default, so a
+# settings.toml written by an older set_config() still imports cleanly
+default_async_file = settings.get("logging_async_file", default_async_file)
+default_queue_size = settings.get("logging_queue_size", default_queue_size)
+default_queue_policy = settings.get("logging_queue_policy", default_queue_policy)
+default_queue_level_policies = dict(
+    settings.get("queue_level_policies", default_queue_level_policies)
+)
+default_queue_sample_rate = settings.get(
+    "logging_queue_sample_rate", default_queue_sample_rate
+)
+default_drop_report_interval = settings.get(
+    "logging_drop_report_interval", default_drop_report_interval
+)
+default_batch_bytes = settings.get("logging_batch_bytes", default_batch_bytes)
+default_batch_ms = settings.get("logging_batch_ms", default_batch_ms)
+default_batch_flush_level = settings.get(
+    "logging_batch_flush_level", default_batch_flush_level
+)
+default_shared_file = settings.get("logging_shared_file", default_shared_file)
+default_max_open_files = settings.get("logging_max_open_files", default_max_open_files)
+default_rotate_bytes = settings.get("logging_rotate_bytes", default_rotate_bytes)
+default_rotate_seconds = settings.get("logging_rotate_seconds", default_rotate_seconds)
+default_backup_count = settings.get("logging_backup_count", default_backup_count)
+default_max_total_bytes = settings.get(
+    "logging_max_total_bytes", default_max_total_bytes
+)
+default_compression = settings.get("logging_compression", default_compression)
+default_timer_aggregate = settings.get(
+    "logging_timer_aggregate", default_timer_aggregate
+)
+default_timer_summary_interval = settings.get(
+    "logging_timer_summary_interval", default_timer_summary_interval
+)
+default_timer_span_tree = settings.get(
+    "logging_timer_span_tree", default_timer_span_tree
+)
+default_trace_file = settings.get("logging_trace_file", default_trace_file)
+default_trace_max_bytes = settings.get(
+    "logging_trace_max_bytes", default_trace_max_bytes
+)
+default_timer_calibrate = settings.get(
+    "logging_timer_calibrate", default_timer_calibrate
+)
+default_timer_watchdog_seconds = settings.get(
+    "logging_timer_watchdog_seconds", default_timer_watchdog_seconds
+)
+default_timer_baseline = settings.get("logging_timer_baseline", default_timer_baseline)
+default_timer_regression_threshold = settings.get(
+    "logging_timer_regression_threshold", default_timer_regression_threshold
+)
+default_color_mode = settings.get("logging_color_mode", default_color_mode)
+
+
+def resolve_plain_console(color_mode: str = default_color_mode) -> bool:
+    """Decide if console output should be plain text
+
+    "auto" goes plain when stderr is not a TTY, "always" and "never" force
+    colors on or off.
+
+    :param color_mode: auto, always or never
+    :return: True for plain output
+    """
+    color_mode = str(color_mode).lower()
+    if color_mode not in COLOR_MODES:
+        base_log.warning(f"Invalid color mode - {color_mode}, using auto")
+        color_mode = "auto"
+    if color_mode == "always":
+        return False
+    if color_mode == "never":
+        return True
+    try:
+        return not os.isatty(sys.__stderr__.fileno())
+    except (AttributeError, OSError, ValueError):
+        return True
+
+
+plain_console = resolve_plain_console()
+
+install_console_handler(base_log)
 log_path = Path(default_log_path)
 
 level_list = []
@@ -356,21 +766,6 @@ def set_log_path(path: str = log_path, auto_create: bool = default_auto_create)
     return path
 
 
-def fix_mod_path(caller_name: str) -> str:
-    """Get file name out of path
-
-    :param caller_name: Path to check
-    :return: Checked path
-    """
-    if ".py" in caller_name:
-        caller_name = Path(caller_name).name
-        caller_name = caller_name.replace(".py", "")
-        split_caller_name = caller_name.split(".")
-        if len(split_caller_name) > 1:
-            caller_name = split_caller_name[-2]
-    return caller_name
-
-
 def verify_level(level: str | int) -> bool:
     """Verifies debug level
 
@@ -447,74 +842,745 @@ def get_parent_logger() -> logging.Logger:
 
     :return:
     """
-    stk = inspect.stack(0)
     ln = sys.argv[0]
-    for fl in stk:
-        if fl.filename == ln:
-            for fs in fl.frame.f_locals:
-                if type(fl.frame.f_locals.get(fs)) is logging.Logger:
-                    return fl.frame.f_locals.get(fs)
-    return get_logger(inspect.stack()[1].filename)
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code.co_filename == ln:
+            for each_value in frame.f_locals.values():
+                if type(each_value) is logging.Logger:
+                    return each_value
+        frame = frame.f_back
+    return get_logger(sys._getframe(1).f_code.co_filename)
+
+
+def assignment_target(filename: str, lineno: int) -> str:
+    """Variable name a call on this line is assigned to
+
+    Reads the line through linecache, so each source file is read once.
+
+    :param filename: Source file
+    :param lineno: Line number
+    :return: Name left of "=" or after "with ... as", empty if neither
+    """
+    line = linecache.getline(filename, lineno).strip()
+    target = ASSIGNMENT_TARGET_PATTERN.match(line)
+    if target:
+        return target.group(1) or target.group(2)
+    return ""
+
+
+class TimerCallsite(NamedTuple):
+    """Facts about the line a Timer was created on"""
+
+    caller: str
+    function: str
+    vid: str
+    mod: types.ModuleType | None
+    start_context: dict
+    stop_context: dict
+    stats_name: str
+    summary_context: dict
+    tree_context: dict
+    trace_name: str
+    trace_args: dict
+    watchdog_context: dict
+
+
+timer_callsites = OrderedDict()
+
+
+def timer_context(timer_caller: str, varname: str) -> dict:
+    """Record extras read by CallerFilter
+
+    :param timer_caller: Full caller path, e.g. file.func.start_timer.var
+    :param varname: Variable the Timer is assigned to
+    :return: Extra fields for the log record
+    :rtype: dict
+    """
+    return {
+        "timer_caller": timer_caller,
+        "timer_funcname": ".".join(timer_caller.split(".")[1:]),
+        "timer_varname": varname,
+    }
+
+
+def build_timer_callsite(
+    filename: str, function: str, module_name: str, vid: str
+) -> TimerCallsite:
+    """Build callsite facts for a Timer
+
+    :param filename: Source file of the caller
+    :param function: Calling function name
+    :param module_name: Module name of the caller
+    :param vid: Timer name, shown as the variable
+    :return: Callsite
+    :rtype: TimerCallsite
+    """
+    caller = fix_mod_path(filename)
+    return TimerCallsite(
+        caller=caller,
+        function=function,
+        vid=vid,
+        mod=sys.modules.get(module_name),
+        start_context=timer_context(f"{caller}.{function}.start_timer.{vid}", vid),
+        stop_context=timer_context(f"{caller}.{function}.stop_timer.{vid}", vid),
+        stats_name=f"{caller}.{function}.{vid}",
+        summary_context=timer_context(f"{caller}.{function}.summary.{vid}", vid),
+        tree_context=timer_context(f"{caller}.{function}.span_tree.{vid}", vid),
+        trace_name=vid or function,
+        trace_args={"caller": f"{caller}.{function}"},
+        watchdog_context=timer_context(f"{caller}.{function}.watchdog.{vid}", vid),
+    )
+
+
+def timer_callsite(frame: types.FrameType, name: str = "") -> TimerCallsite:
+    """Callsite facts for a Timer created in frame
+
+    Cached per call instruction, keyed on the code object's file, first line
+    and the frame's bytecode offset. Reading f_lineno or hashing the code
+    object costs more than the rest of the lookup. The cache keeps the
+    TIMER_CALLSITE_CACHE_SIZE most recently used sites.
+
+    :param frame: Frame that creates the Timer
+    :param name: Timer name, defaults to the assigned variable
+    :return: Callsite
+    :rtype: TimerCallsite
+    """
+    code = frame.f_code
+    key = (code.co_filename, code.co_firstlineno, frame.f_lasti, name)
+    callsite = timer_callsites.get(key)
+    if callsite is not None:
+        timer_callsites.move_to_end(key)
+        return callsite
+
+    callsite = build_timer_callsite(
+        code.co_filename,
+        code.co_name,
+        frame.f_globals.get("__name__"),
+        name or assignment_target(code.co_filename, frame.f_lineno),
+    )
+    timer_callsites[key] = callsite
+    if len(timer_callsites) > TIMER_CALLSITE_CACHE_SIZE:
+        timer_callsites.popitem(last=False)
+    return callsite
+
+
+timer_loggers = {}
+
+
+def get_timer_logger(
+    parent_logger: logging.Logger, module_logger_name: str
+) -> logging.Logger:
+    """Shared timer logger for a module
+
+    Built once per parent logger and module, then reused by every Timer in
+    that module, so creating a Timer does not add loggers or handlers.
+
+    :param parent_logger: Logger the timer logger is a child of
+    :param module_logger_name: Name of the module's logger
+    :return: Timer logger
+    :rtype: logging.Logger
+    """
+    key = (parent_logger.name, module_logger_name)
+    timer_logger = timer_loggers.get(key)
+    if timer_logger is not None:
+        return timer_logger
+
+    child_name = f"{fix_mod_path(module_logger_name)}.timer"
+    timer_logger = parent_logger.getChild(child_name)
+    timer_logger.setLevel(parent_logger.root.level)
+    timer_logger.filters = [
+        each_filter
+        for each_filter in timer_logger.filters
+        if not isinstance(each_filter, (NameFilter, CallerFilter))
+    ]
+    timer_logger.addFilter(NameFilter())
+    timer_logger.addFilter(CallerFilter())
+    timer_logger.propagate = False
+    install_console_handler(
+        timer_logger,
+        level=parent_logger.root.level,
+        fmt=caller_log_format,
+        field_styles=caller_color_format,
+    )
+    timer_loggers[key] = timer_logger
+    return timer_logger
+
+
+timer_summary_targets = {}
+
+
+def log_timer_summary(name: str, summary: dict) -> None:
+    """Log the aggregated summary of one timer
+
+    :param name: Timer stats name
+    :param summary: Summary from timer_stats
+    """
+    target = timer_summary_targets.get(name)
+    if target is None:
+        return
+    timer_logger, levelno, summary_context = target
+    timer_logger.log(levelno, format_summary(summary), extra=summary_context)
+
+
+def record_timer_duration(
+    callsite: TimerCallsite,
+    timer_logger: logging.Logger,
+    levelno: int,
+    duration_ns: int,
+    metrics: dict | None = None,
+) -> None:
+    """Add a duration to the aggregated stats of a timer
+
+    The first duration of a timer starts the summary thread.
+
+    :param callsite: Timer callsite
+    :param timer_logger: Logger the summary goes to
+    :param levelno: Level of the summary
+    :param duration_ns: Duration in nanoseconds
+    :param metrics: Probe metrics of this run
+    """
+    if callsite.stats_name not in timer_summary_targets:
+        if not timer_summary_targets and default_timer_baseline:
+            # Registered before timer_stats.stop so it runs after the final summary
+            atexit.register(check_timer_baseline)
+        timer_summary_targets[callsite.stats_name] = (
+            timer_logger,
+            levelno,
+            callsite.summary_context,
+        )
+        timer_stats.start(log_timer_summary, default_timer_summary_interval)
+    timer_stats.record(callsite.stats_name, duration_ns, metrics)
+
+
+def timer_baseline_path() -> Path:
+    """Baseline file of this program under the log path
+
+    :return: Path of <process>.timer-baseline.json
+    :rtype: Path
+    """
+    process_name = fix_mod_path(sys.argv[0]).strip("-") or "sclogging"
+    return log_path / f"{process_name}.timer-baseline.json"
+
+
+def check_timer_baseline(
+    threshold: float = default_timer_regression_threshold,
+) -> list[Regression]:
+    """Compare aggregated timers with the last run and save them as the new baseline
+
+    Each regression is logged as a warning on the logger of its timer.
+
+    :param threshold: Allowed relative p50 and p99 slowdown, 0.2 is 20%
+    :return: Regressions against the previous baseline
+    :rtype: list
+    """
+    current = baseline_from_summaries(timer_stats.summaries())
+    if not current["timers"]:
+        return []
+    path = timer_baseline_path()
+    regressions = compare_baselines(load_baseline(str(path)), current, threshold)
+    for regression in regressions:
+        timer_logger, _levelno, summary_context = timer_summary_targets.get(
+            regression.name, (base_log, 0, {})
+        )
+        timer_logger.warning(f"Timer regression - {regression}", extra=summary_context)
+    try:
+        save_baseline(str(path), current)
+    except OSError as error:
+        base_log.warning(f"Unable to save timer baseline {path} - {error}")
+    return regressions
+
+
+def timer_probes(
+    cpu: bool = False, context_switches: bool = False, memory: str | None = None
+) -> tuple:
+    """Names of the probes a timer samples at start and stop
+
+    :param cpu: Process and thread CPU time
+    :param context_switches: Voluntary and involuntary context switches
+    :param memory: tracemalloc or rss
+    :return: Probe names
+    :rtype: tuple
+    """
+    probes = []
+    if cpu:
+        probes.append("cpu")
+    if context_switches and resource is not None:
+        probes.append("context_switches")
+    if memory:
+        memory = str(memory).lower()
+        if memory not in MEMORY_PROBES:
+            base_log.warning(f"Invalid memory probe - {memory}")
+        elif memory == "tracemalloc" or statm_fd() is not None:
+            probes.append(memory)
+    return tuple(probes)
+
+
+statm = None
+
+
+def statm_fd() -> int | None:
+    """File descriptor of /proc/self/statm, opened once per process
+
+    :return: Descriptor, None where /proc is not available
+    """
+    global statm
+
+    if statm is None:
+        try:
+            statm = os.open("/proc/self/statm", os.O_RDONLY)
+        except OSError:
+            statm = -1
+    return statm if statm >= 0 else None
+
+
+def resident_bytes() -> int:
+    """Resident set size of the process from /proc/self/statm
+
+    :return: RSS in bytes
+    :rtype: int
+    """
+    return int(os.pread(statm, 64, 0).split()[1]) * PAGE_SIZE
+
+
+def reopen_statm() -> None:
+    """Reopen /proc/self/statm in a forked child
+
+    The inherited descriptor still points at the parent's statm.
+    """
+    global statm
+
+    if statm is not None and statm >= 0:
+        os.close(statm)
+        statm = None
+        statm_fd()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reopen_statm)
+
+
+def sample_timer_probes(probes: tuple, starting: bool = False) -> dict:
+    """Read the current value of each probe
+
+    With tracemalloc the peak is reset when starting, so the peak at stop
+    belongs to the timed section. Nothing is sampled if tracemalloc is not
+    tracing.
+
+    :param probes: Probe names from timer_probes
+    :param starting: Sample is taken at the start of a section
+    :return: Metric name to current value
+    :rtype: dict
+    """
+    sample = {}
+    if "cpu" in probes:
+        sample["cpu_process_ns"] = time.process_time_ns()
+        sample["cpu_thread_ns"] = time.thread_time_ns()
+    if "context_switches" in probes:
+        usage = resource.getrusage(
+            getattr(resource, "RUSAGE_THREAD", resource.RUSAGE_SELF)
+        )
+        sample["voluntary_switches"] = usage.ru_nvcsw
+        sample["involuntary_switches"] = usage.ru_nivcsw
+    if "tracemalloc" in probes and tracemalloc.is_tracing():
+        if starting:
+            tracemalloc.reset_peak()
+        current, peak = tracemalloc.get_traced_memory()
+        sample["memory_delta_bytes"] = current
+        sample["memory_peak_bytes"] = current if starting else peak
+    if "rss" in probes:
+        sample["rss_delta_bytes"] = resident_bytes()
+    return sample
+
+
+def timer_probe_metrics(start_sample: dict, stop_sample: dict) -> dict:
+    """Change of each probe between start and stop
+
+    :param start_sample: Sample taken at start
+    :param stop_sample: Sample taken at stop
+    :return: Metric name to change
+    :rtype: dict
+    """
+    return {
+        metric: value - start_sample[metric]
+        for metric, value in stop_sample.items()
+        if metric in start_sample
+    }
+
+
+TIMER_CALIBRATION_SAMPLES = 2000
+MEMORY_PROBES = ("tracemalloc", "rss")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+timer_overhead_ns = 0
+clock_overhead_ns = 0
+trace_writer = None
+trace_writer_lock = threading.Lock()
+
+
+def get_trace_writer() -> TraceWriter:
+    """Trace file writer of this process, started on first use
+
+    :return: Trace writer
+    :rtype: TraceWriter
+    """
+    global trace_writer
+
+    with trace_writer_lock:
+        if trace_writer is None:
+            process_name = fix_mod_path(sys.argv[0]).strip("-") or "sclogging"
+            log_time = datetime.now().strftime("%m%d%y-%H%M")
+            trace_writer = TraceWriter(
+                str(log_path / f"{process_name}-{log_time}-{os.getpid()}.trace.json"),
+                default_trace_max_bytes,
+            )
+    return trace_writer
+
+
+def reset_trace_writer() -> None:
+    """Drop the inherited trace writer in a forked child
+
+    Its thread only ran in the parent. The child opens its own <pid> file
+    with its first span.
+    """
+    global trace_writer
+    global trace_writer_lock
+
+    if trace_writer is not None:
+        atexit.unregister(trace_writer.close)
+    trace_writer = None
+    trace_writer_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_trace_writer)
+
+
+def trace_timer(callsite: TimerCallsite, start_ns: int, duration_ns: int) -> None:
+    """Add a timer run to the trace file
+
+    :param callsite: Timer callsite
+    :param start_ns: perf_counter_ns value at start
+    :param duration_ns: Raw duration in nanoseconds
+    """
+    writer = trace_writer or get_trace_writer()
+    writer.add(
+        callsite.trace_name,
+        "timer",
+        start_ns / 1_000,
+        duration_ns / 1_000,
+        callsite.trace_args,
+    )
+
+
+def report_slow_timer(watch: Watch, stack: str) -> None:
+    """Warn about a timer that is still running past its threshold
+
+    :param watch: Expired watch, payload is the callsite and timer logger
+    :param stack: Current stack of the timer's thread
+    """
+    callsite, timer_logger = watch.payload
+    elapsed_ns = time.perf_counter_ns() - watch.start_ns
+    timer_logger.warning(
+        f"Timer still running after {format_duration(elapsed_ns)}\n{stack.rstrip()}",
+        extra=callsite.watchdog_context,
+    )
+
+
+timer_watchdog = TimerWatchdog(report_slow_timer)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=timer_watchdog.after_fork)
+
+
+def resolve_watchdog_ns(watchdog: float | None) -> int:
+    """Watchdog threshold of a timer in nanoseconds
+
+    :param watchdog: Seconds, None for logging_timer_watchdog_seconds
+    :return: Threshold, 0 when off
+    :rtype: int
+    """
+    if watchdog is None:
+        watchdog = default_timer_watchdog_seconds
+    if not watchdog:
+        return 0
+    return max(int(watchdog * 1_000_000_000), 0)
+
+
+def finish_timer_span(
+    span,
+    duration_ns: int,
+    callsite: TimerCallsite,
+    timer_logger: logging.Logger,
+    levelno: int,
+) -> None:
+    """Close a timer span and log the tree when a root with children ends
+
+    :param span: Span from open_span
+    :param duration_ns: Duration in nanoseconds
+    :param callsite: Timer callsite
+    :param timer_logger: Logger the tree goes to
+    :param levelno: Level of the tree record
+    """
+    root = close_span(span, duration_ns)
+    if root is not None and root.children:
+        timer_logger.log(
+            levelno,
+            f"Timer tree\n{format_span_tree(root)}",
+            extra=callsite.tree_context,
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_timer_level(level: str | int) -> str:
+    """Level name for a timer, falling back to the default level
+
+    Cached, so an invalid level is only reported once.
+
+    :param level: Level name or number
+    :return: Level name
+    :rtype: str
+    """
+    if not verify_level(level):
+        return default_level
+    if type(level) is str:
+        return level.upper()
+    return logging.getLevelName(level)
+
+
+module_timer_loggers = {}
+
+
+def timer_loggers_for(mod: types.ModuleType | None) -> tuple:
+    """Parent and timer logger for Timers in a module
+
+    Cached per module until the next set_config.
+
+    :param mod: Module the Timer is used in
+    :return: Parent logger and timer logger
+    :rtype: tuple
+    """
+    loggers = module_timer_loggers.get(mod)
+    if loggers is not None:
+        return loggers
+    mod_vars = vars(mod) if mod is not None else {}
+    parent_logger = mod_vars.get("base_logger", base_logger)
+    parent_logger.propagate = False
+    module_logger = mod_vars.get("logger")
+    if isinstance(module_logger, logging.Logger):
+        module_logger_name = module_logger.name
+    else:
+        module_logger_name = mod_vars.get("__name__", "__main__")
+    loggers = (parent_logger, get_timer_logger(parent_logger, module_logger_name))
+    module_timer_loggers[mod] = loggers
+    return loggers
 
 
 class Timer:
     """Custom timer class
 
-    Level sets what level of debug the timer displays at
-    """
+    Level sets what level of debug the timer displays at. Can also be used
+    as a context manager (with Timer(name="load"):) or through Timer.timed
+    as a decorator. Both skip timing entirely when the level is disabled.
+
+    In aggregate mode durations go into a histogram per timer instead of
+    one log line per start and stop, and a summary is logged periodically.
 
-    _counter = 0
+    With logging_timer_span_tree, timers started inside another timer in
+    the same thread or task form a tree. When the outermost timer stops,
+    the tree is logged with total and exclusive time per timer.
+
+    cpu and context_switches add CPU time and context switch counts of the
+    timed section to the stop record and to the aggregated stats. memory
+    adds the allocation delta and peak from tracemalloc, or the RSS delta
+    with memory="rss".
+
+    watchdog (seconds, default logging_timer_watchdog_seconds) logs a
+    warning with the thread's stack while a timer is still running past it.
+    """
 
-    def __init__(self, level: str | int = "DEBUG"):
-        Timer._counter += 1
-        self.count = Timer._counter
+    _counter = itertools.count(1)
+
+    def __init__(
+        self,
+        level: str | int = "DEBUG",
+        name: str = "",
+        aggregate: bool | None = None,
+        cpu: bool = False,
+        context_switches: bool = False,
+        memory: str | None = None,
+        watchdog: float | None = None,
+    ):
+        self.count = next(Timer._counter)
         self.start_time = 0
         self.end_time = 0
-        self.logger = None
-        self.stack = inspect.stack()
-        self.frame = self.stack[1]
-        self.caller = fix_mod_path(self.frame.filename)
-        self.function = self.frame.function
-        self.context = self.frame.code_context[0].strip().find("=")
-        self.vid = self.frame.code_context[0].strip()[: self.context - 1]
-        self.mod = inspect.getmodule(self.frame[0])
-        try:
-            self.logger = self.mod.__getattribute__("base_logger")
-        except AttributeError:
-            self.logger = base_logger
-        self.logger.propagate = False
-        if verify_level(level):
-            self.level = level
-            if type(self.level) is str:
-                self.level = self.level.upper()
-            else:
-                self.level = logging.getLevelName(self.level)
-        else:
-            self.level = default_level
-        child_name = f"{fix_mod_path(self.mod.logger.name)}.{self.count}"
-        self.timer_logger = self.logger.getChild(child_name)
-        self.timer_logger.setLevel(self.logger.root.level)
-        self.timer_logger.addFilter(NameFilter())
-        self.timer_logger.addFilter(CallerFilter())
-        self.timer_logger.propagate = False
-        cl.install(
-            logger=self.timer_logger,
-            level=self.logger.root.level,
-            fmt=caller_log_format,
-            field_styles=caller_color_format,
-        )
+        self.start_ns = 0
+        self.raw_ns = 0
+        self.corrected_ns = 0
+        self.probes = timer_probes(cpu, context_switches, memory)
+        self.probe_start = None
+        self.metrics = {}
+        self.watchdog_ns = resolve_watchdog_ns(watchdog)
+        self.watch = None
+        self.enabled = True
+        self.span = None
+        self.callsite = timer_callsite(sys._getframe(1), name)
+        self.caller, self.function, self.vid, self.mod = self.callsite[:4]
+        self.logger, self.timer_logger = timer_loggers_for(self.mod)
+        self.level = resolve_timer_level(level)
+        self.levelno = logging.getLevelName(self.level)
+        if aggregate is None:
+            aggregate = default_timer_aggregate
+        self.aggregate = aggregate
+
+    def __enter__(self):
+        self.enabled = self.timer_logger.isEnabledFor(self.levelno)
+        if self.enabled:
+            self.start_timer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.enabled:
+            self.stop_timer()
+        return False
+
+    @classmethod
+    def timed(
+        cls,
+        level: str | int = "DEBUG",
+        name: str = "",
+        aggregate: bool | None = None,
+        cpu: bool = False,
+        context_switches: bool = False,
+        memory: str | None = None,
+        watchdog: float | None = None,
+    ):
+        """Decorator that times each call of a function
+
+        Callsite, level and logger are resolved once when decorating. When
+        the level is disabled the function is called directly.
+
+        :param level: Level to log at
+        :param name: Timer name, defaults to the function name
+        :param aggregate: Aggregate durations instead of logging each call
+        :param cpu: Add CPU time of each call
+        :param context_switches: Add context switches of each call
+        :param memory: Add memory use of each call, tracemalloc or rss
+        :param watchdog: Warn while a call runs longer than this many seconds
+        :return: Decorator
+        """
+        level_name = resolve_timer_level(level)
+        levelno = logging.getLevelName(level_name)
+        if aggregate is None:
+            aggregate = default_timer_aggregate
+        probes = timer_probes(cpu, context_switches, memory)
+        watchdog_ns = resolve_watchdog_ns(watchdog)
+
+        def decorator(func):
+            code = func.__code__
+            callsite = build_timer_callsite(
+                code.co_filename,
+                func.__name__,
+                func.__module__,
+                name or func.__name__,
+            )
+            timer_logger = timer_loggers_for(callsite.mod)[1]
+            watch_payload = (callsite, timer_logger)
+            start_context = callsite.start_context
+            stop_context = callsite.stop_context
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not timer_logger.isEnabledFor(levelno):
+                    return func(*args, **kwargs)
+                probe_start = (
+                    sample_timer_probes(probes, starting=True) if probes else None
+                )
+                if aggregate:
+                    start_ns = time.perf_counter_ns()
+                    watch = None
+                    if watchdog_ns:
+                        watch = timer_watchdog.watch(
+                            start_ns, watchdog_ns, watch_payload
+                        )
+                    try:
+                        return func(*args, **kwargs)
+                    finally:
+                        raw_ns = time.perf_counter_ns() - start_ns
+                        if watch is not None:
+                            watch.cancel()
+                        metrics = None
+                        if probe_start is not None:
+                            metrics = timer_probe_metrics(
+                                probe_start, sample_timer_probes(probes)
+                            )
+                        record_timer_duration(
+                            callsite,
+                            timer_logger,
+                            levelno,
+                            max(raw_ns - clock_overhead_ns, 0),
+                            metrics,
+                        )
+                        if default_trace_file:
+                            trace_timer(callsite, start_ns, raw_ns)
+                timer_logger.log(levelno, "Timer started", extra=start_context)
+                span = open_span(callsite.vid) if default_timer_span_tree else None
+                start_ns = time.perf_counter_ns()
+                watch = None
+                if watchdog_ns:
+                    watch = timer_watchdog.watch(start_ns, watchdog_ns, watch_payload)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    raw_ns = time.perf_counter_ns() - start_ns
+                    if watch is not None:
+                        watch.cancel()
+                    corrected_ns = max(raw_ns - clock_overhead_ns, 0)
+                    logger_note = f"Timer took {raw_ns / 1_000_000_000:.3f} seconds"
+                    if clock_overhead_ns:
+                        logger_note += (
+                            f" (raw {format_duration(raw_ns)}, "
+                            f"corrected {format_duration(corrected_ns)})"
+                        )
+                    extra = stop_context
+                    if probe_start is not None:
+                        metrics = timer_probe_metrics(
+                            probe_start, sample_timer_probes(probes)
+                        )
+                        logger_note += f" [{format_metrics(metrics)}]"
+                        extra = {**stop_context, "timer_metrics": metrics}
+                    timer_logger.log(levelno, logger_note, extra=extra)
+                    if default_trace_file:
+                        trace_timer(callsite, start_ns, raw_ns)
+                    if span is not None:
+                        finish_timer_span(
+                            span, corrected_ns, callsite, timer_logger, levelno
+                        )
+
+            return wrapper
+
+        return decorator
 
     def start_timer(self, note: str = "", show_process: bool = False):
         """Start timer
 
+        The start time is taken after the start record is logged, so the
+        measured time does not include it.
+
         :param note: Note for logger
         :param show_process: Show process name in default message
         :return:
         """
-        setattr(Timer, "svid", self.vid)
-        local_func = inspect.getframeinfo(inspect.currentframe()).function
-        fcaller = f"{self.caller}.{self.function}.{local_func}.{self.vid}"
-        setattr(Timer, "scaller", fcaller)
+        enabled = self.timer_logger.isEnabledFor(self.levelno)
+        if self.aggregate or not enabled:
+            if self.probes and enabled:
+                self.probe_start = sample_timer_probes(self.probes, starting=True)
+            self.start_ns = time.perf_counter_ns()
+            self.start_time = self.start_ns / 1_000_000_000
+            if self.watchdog_ns and enabled:
+                self.watch = timer_watchdog.watch(
+                    self.start_ns, self.watchdog_ns, (self.callsite, self.timer_logger)
+                )
+            return
         if not note:
             if show_process:
                 logger_note = f"Timer started - {self.vid}"
@@ -523,72 +1589,218 @@ class Timer:
         else:
             logger_note = note.replace("%p%", self.vid)
 
-        self.start_time = time.perf_counter()
-        self.timer_logger.log(logging.getLevelName(self.level), logger_note)
-        setattr(Timer, "svid", "")
-        setattr(Timer, "scaller", "")
+        self.timer_logger.log(
+            self.levelno,
+            logger_note,
+            extra=self.callsite.start_context,
+        )
+        if default_timer_span_tree:
+            self.span = open_span(self.vid)
+        if self.probes:
+            self.probe_start = sample_timer_probes(self.probes, starting=True)
+        self.start_ns = time.perf_counter_ns()
+        self.start_time = self.start_ns / 1_000_000_000
+        if self.watchdog_ns:
+            self.watch = timer_watchdog.watch(
+                self.start_ns, self.watchdog_ns, (self.callsite, self.timer_logger)
+            )
 
     def stop_timer(self, note: str = "", show_process: bool = False):
         """Stop timer
 
-        Use %t% to insert time in custom note
+        Use %t% to insert time in custom note, %c% for the time with the
+        calibrated timer overhead taken off and %m% for probe metrics
 
         :param note: Note for logger
         :param show_process: Show process name in default message
-        :return:
+        :return: Raw time in seconds
         """
-        setattr(Timer, "svid", self.vid)
-        local_func = inspect.getframeinfo(inspect.currentframe()).function
-        fcaller = f"{self.caller}.{self.function}.{local_func}.{self.vid}"
-        setattr(Timer, "scaller", fcaller)
-        if not self.start_time:
-            self.logger.log(logging.getLevelName(
-                self.level), "Timer was not started")
-            setattr(Timer, "svid", "")
-            setattr(Timer, "scaller", "")
+        end_ns = time.perf_counter_ns()
+        if self.watch is not None:
+            self.watch.cancel()
+            self.watch = None
+        if self.probe_start is not None:
+            self.metrics = timer_probe_metrics(
+                self.probe_start, sample_timer_probes(self.probes)
+            )
+            self.probe_start = None
+        else:
+            self.metrics = {}
+        if not self.start_ns:
+            self.logger.log(
+                self.levelno,
+                "Timer was not started",
+                extra=self.callsite.stop_context,
+            )
             return 0
 
-        self.end_time = time.perf_counter()
-        total_time = self.end_time - self.start_time
-
+        self.end_time = end_ns / 1_000_000_000
+        self.raw_ns = end_ns - self.start_ns
+        self.corrected_ns = max(self.raw_ns - timer_overhead_ns, 0)
+        total_time = self.raw_ns / 1_000_000_000
+        span, self.span = self.span, None
+        enabled = self.timer_logger.isEnabledFor(self.levelno)
+        if default_trace_file and enabled:
+            trace_timer(self.callsite, self.start_ns, self.raw_ns)
+        if self.aggregate or not enabled:
+            if span is not None:
+                close_span(span, self.corrected_ns)
+            if self.aggregate and enabled:
+                record_timer_duration(
+                    self.callsite,
+                    self.timer_logger,
+                    self.levelno,
+                    self.corrected_ns,
+                    self.metrics,
+                )
+            self.start_ns = self.start_time = 0
+            return total_time
+
+        corrected_time = self.corrected_ns / 1_000_000_000
         if not note:
+            logger_note = f"Timer took {total_time:.3f} seconds"
+            if timer_overhead_ns:
+                logger_note += (
+                    f" (raw {format_duration(self.raw_ns)}, "
+                    f"corrected {format_duration(self.corrected_ns)})"
+                )
+            if self.metrics:
+                logger_note += f" [{format_metrics(self.metrics)}]"
             if show_process:
-                logger_note = f"Timer took {total_time:.3f} seconds - {self.vid}"
-            else:
-                logger_note = f"Timer took {total_time:.3f} seconds"
+                logger_note += f" - {self.vid}"
         else:
-            logger_note = note.replace("%t%", f"{total_time:.3f}").replace(
-                "%p%", self.vid
+            logger_note = (
+                note.replace("%t%", f"{total_time:.3f}")
+                .replace("%c%", f"{corrected_time:.3f}")
+                .replace("%m%", format_metrics(self.metrics))
+                .replace("%p%", self.vid)
             )
 
-        self.timer_logger.log(logging.getLevelName(self.level), logger_note)
-        setattr(Timer, "svid", "")
-        setattr(Timer, "scaller", "")
-        self.start_time = 0
+        extra = self.callsite.stop_context
+        if self.metrics:
+            extra = {**extra, "timer_metrics": self.metrics}
+        self.timer_logger.log(self.levelno, logger_note, extra=extra)
+        if span is not None:
+            finish_timer_span(
+                span,
+                self.corrected_ns,
+                self.callsite,
+                self.timer_logger,
+                self.levelno,
+            )
+        self.start_ns = self.start_time = 0
 
         return total_time
 
 
-def text_color(text: str, style: str, attrib: str) -> str:
-    """Get default colors and sets for level
+def calibrate_timer_overhead(samples: int = TIMER_CALIBRATION_SAMPLES) -> int:
+    """Measure the cost of the timer instrumentation itself
+
+    Times empty start_timer/stop_timer pairs on a timer whose logger drops
+    everything, and empty perf_counter_ns pairs for Timer.timed. The medians
+    are stored and subtracted from later timings.
 
-    :param text: Text to be default color
-    :param style: Style to reset
-    :param attrib: Attribute to reset
-    :return: Color
+    :param samples: Number of empty pairs to time
+    :return: Timer overhead in nanoseconds
+    :rtype: int
+    """
+    global timer_overhead_ns
+    global clock_overhead_ns
+
+    timer_overhead_ns = clock_overhead_ns = 0
+    silent_logger = logging.getLogger("sclogging.calibration")
+    silent_logger.setLevel(logging.CRITICAL + 1)
+    silent_logger.propagate = False
+    timer = Timer(name="calibration")
+    timer.timer_logger = silent_logger
+
+    timer_samples = []
+    clock_samples = []
+    perf_counter_ns = time.perf_counter_ns
+    for _ in range(samples):
+        timer.start_timer()
+        timer.stop_timer()
+        timer_samples.append(timer.raw_ns)
+        start_ns = perf_counter_ns()
+        clock_samples.append(perf_counter_ns() - start_ns)
+    timer_samples.sort()
+    clock_samples.sort()
+    timer_overhead_ns = timer_samples[samples // 2]
+    clock_overhead_ns = clock_samples[samples // 2]
+    return timer_overhead_ns
+
+
+@functools.lru_cache(maxsize=STYLE_MARKUP_CACHE_SIZE)
+def compile_style_markup(template: str) -> tuple[tuple[bool, str], ...]:
+    """Compile style tags into literal and ANSI segments
+
+    Single pass over %f.color%...%f%, %s.style%...%s% and %b.color%...%b% tags.
+    A tag only opens if its closing tag follows on the same line, matching the
+    old per-tag regex passes. Results are cached per template.
+
+    :param template: Message with style tags
+    :return: Tuple of (is_ansi, text) segments
+    :rtype: tuple
+    """
+    tokens = list(STYLE_TAG_TOKEN_PATTERN.finditer(template))
+
+    # Walk backwards to find which opening tags have a close on the same line
+    closable = [False] * len(tokens)
+    closes_ahead = set()
+    for index in range(len(tokens) - 1, -1, -1):
+        tag, name = tokens[index].groups()
+        if tag is None:
+            closes_ahead.clear()
+        elif name is None:
+            closes_ahead.add(tag)
+        else:
+            closable[index] = tag in closes_ahead
+
+    segments = []
+    open_tags = set()
+    position = 0
+
+    def add_literal(text: str) -> None:
+        if text:
+            segments.append((False, text))
+
+    for index, token in enumerate(tokens):
+        tag, name = token.groups()
+        if tag is None:
+            continue
+        if name is None:
+            if tag not in open_tags:
+                continue
+            add_literal(template[position: token.start()])
+            segments.append((True, STYLE_RESETS[tag]))
+            open_tags.discard(tag)
+        else:
+            if tag in open_tags or not closable[index]:
+                continue
+            tag_index = list(STYLE_TAGS).index(tag)
+            if name.upper() not in valid_attrib[tag_index]:
+                print(f"Invalid option specified - {name}")
+                continue
+            add_literal(template[position: token.start()])
+            style_module = getattr(cr, STYLE_TAGS[tag].title())
+            segments.append((True, getattr(style_module, name.upper())))
+            open_tags.add(tag)
+        position = token.end()
+    add_literal(template[position:])
+
+    return tuple(segments)
+
+
+def render_style_markup(template: str) -> str:
+    """Render style tags in template to ANSI codes
+
+    :param template: Message with style tags
+    :return: Message with ANSI codes
     :rtype: str
     """
-    reset = ""
-    if attrib.lower() == "fore":
-        reset = cr.Fore.RESET
-    elif attrib.lower() == "back":
-        reset = cr.Back.RESET
-    elif attrib.lower() == "style":
-        reset = cr.Style.RESET_ALL
-
-    r_text = repr(text)[1:-1]
-
-    return getattr(getattr(cr, attrib.title()), style.upper()) + r_text + reset
+    if "%" not in template:
+        return template
+    return "".join(text for _, text in compile_style_markup(template))
 
 
 class CallerFilter(logging.Filter):
@@ -600,33 +1812,143 @@ class CallerFilter(logging.Filter):
 
     def filter(self, record: logging.LogRecord) -> bool:
         """
-        Add spacers to record
+        Add timer caller to record
 
         :param record: Record to check
         :type record: logging.LogRecord
         :return:
         :rtype: bool
         """
-        term_c = get_terminal_size()
-        timer_scaller = getattr(Timer, "scaller", "")
-        timer_scaller_join = ""
-        if timer_scaller:
-            timer_scaller_split = timer_scaller.split(".")
-            timer_scaller_join = ".".join(timer_scaller_split[1:])
-        spacers = (spacer_color + spacer) * (term_c - len(timer_scaller_join))
-        record.caller = f"{timer_scaller_join} {spacers}"
-        record.funcName = f"{timer_scaller_join} {spacers}"
-
-        record.varname = getattr(Timer, "svid", "")
-        record.filefuncName = timer_scaller
+        timer_funcname = getattr(record, "timer_funcname", "")
+        record.caller = timer_funcname
+        record.funcName = timer_funcname
+
+        record.varname = getattr(record, "timer_varname", "")
+        record.filefuncName = getattr(record, "timer_caller", "")
         return True
 
 
+class FileLevelFilter(logging.Filter):
+    """Per-logger file levels for the shared log file"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.name = "FileLevelFilter"
+        self.levels = {}
+
+    def set_level(self, logger_name: str, level: str | int) -> None:
+        """
+        Set file level for one logger
+
+        :param logger_name: Logger name as shown in the file
+        :param level: Level
+        """
+        if type(level) is not int:
+            level = logging.getLevelName(level.upper())
+        self.levels[logger_name] = level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Drop records below the file level of their logger
+
+        :param record: Record to check
+        :type record: logging.LogRecord
+        :return: True to write the record
+        :rtype: bool
+        """
+        return record.levelno >= self.levels.get(record.name, logging.NOTSET)
+
+
+file_handler_pool = FileHandlerPool(default_max_open_files)
+file_level_filter = FileLevelFilter()
+shared_log_path = None
+
+
+def get_shared_log_path() -> Path:
+    """Path of the shared log file, fixed at its first use
+
+    :return: Log file path
+    """
+    global shared_log_path
+
+    if shared_log_path is None:
+        process_name = fix_mod_path(sys.argv[0]).strip("-") or "sclogging"
+        log_time = datetime.now().strftime("%m%d%y-%H%M")
+        shared_log_path = Path(
+            log_path / f"{process_name}-{log_time}.{default_log_ext}")
+    return shared_log_path
+
+
+def build_file_handler(
+    path: str | Path,
+    async_file: bool = default_async_file,
+    queue_policy: str = default_queue_policy,
+    shared: bool = False,
+) -> logging.Handler:
+    """Creates the handler for one log file
+
+    :param path: Log file path
+    :param async_file: Write the file from a background thread
+    :param queue_policy: Policy when the async queue is full
+    :param shared: File is shared by all loggers, adds a logger name column
+    :return: Handler
+    :rtype: logging.Handler
+    """
+    rotator = None
+    if default_rotate_bytes or default_rotate_seconds:
+        compression = str(default_compression).lower()
+        if compression not in COMPRESSION_TYPES:
+            base_log.warning(f"Invalid compression - {compression}, using gzip")
+            compression = "gzip"
+        rotator = LogRotator(
+            os.path.abspath(path),
+            max_bytes=default_rotate_bytes,
+            interval=default_rotate_seconds,
+            backup_count=default_backup_count,
+            max_total_bytes=default_max_total_bytes,
+            compression=compression,
+        )
+    if default_batch_bytes or rotator:
+        batch_flush_level = str(default_batch_flush_level).upper()
+        if not verify_level(batch_flush_level):
+            batch_flush_level = "ERROR"
+        log_file = BatchFileHandler(
+            path,
+            batch_bytes=default_batch_bytes,
+            batch_ms=default_batch_ms,
+            flush_level=logging.getLevelName(batch_flush_level),
+            rotator=rotator,
+        )
+    else:
+        log_file = logging.FileHandler(path)
+    if async_file:
+        log_file = AsyncFileHandler(
+            log_file,
+            queue_size=default_queue_size,
+            policy=queue_policy,
+            level_policies=default_queue_level_policies,
+            sample_rate=default_queue_sample_rate,
+            report_interval=default_drop_report_interval,
+        )
+    log_format = shared_file_log_format if shared else file_log_format
+    log_file.setFormatter(
+        FileFormatter(fmt=log_format, datefmt="%Y-%m-%d %H:%M:%S"))
+    if shared:
+        log_file.addFilter(file_level_filter)
+    return log_file
+
+
+logger_registry = {}
+logger_file_handlers = {}
+
+
 def get_logger(
     caller_name: str = None,
     level: str | int = default_level,
     log_to_file: bool = default_log_to_file,
     log_file_level: str | int = default_file_level,
+    async_file: bool = default_async_file,
+    queue_policy: str = default_queue_policy,
 ) -> logging.Logger:
     """Configures a logger
 
@@ -634,11 +1956,20 @@ def get_logger(
     :param level: Debug level
     :param log_to_file: Logs to file in path set by set_log_path
     :param log_file_level: Level for file if different from base level
+    :param async_file: Write the log file from a background thread
+    :param queue_policy: What async_file does when its queue is full:
+        block, drop_oldest, drop_newest or sample
     :return: Logger
     :rtype: logging.Logger
     """
     if not caller_name:
-        caller_name = inspect.stack()[1].filename
+        caller_name = sys._getframe(1).f_code.co_filename
+    caller_name = fix_mod_path(caller_name)
+    logger_config = (level, log_to_file, log_file_level, async_file, queue_policy)
+    registered = logger_registry.get(caller_name)
+    if registered is not None and registered[0] == logger_config:
+        return registered[1]
+
     if type(level) is not int:
         level = level.upper()
     if type(log_file_level) is not int:
@@ -649,36 +1980,55 @@ def get_logger(
     if not verify_level(log_file_level) and log_to_file:
         base_log.warning(f"Using {default_level}")
         log_file_level = default_level
+    if queue_policy not in QUEUE_POLICIES:
+        base_log.warning(
+            f"Invalid queue policy - {queue_policy}, using {default_queue_policy}"
+        )
+        queue_policy = default_queue_policy
 
-    caller_name = fix_mod_path(caller_name)
-
-    current_time = datetime.now()
-    log_time = current_time.strftime("%m%d%y-%H%M")
-
-    log_file_name = f"{caller_name}-{log_time}.{default_log_ext}"
-    log_full_path = Path(log_path / log_file_name)
+    if default_shared_file:
+        log_full_path = get_shared_log_path()
+    else:
+        current_time = datetime.now()
+        log_time = current_time.strftime("%m%d%y-%H%M")
 
-    log_formatter = logging.Formatter(
-        fmt=file_log_format, datefmt="%Y-%m-%d %H:%M:%S")
+        log_file_name = f"{caller_name}-{log_time}.{default_log_ext}"
+        log_full_path = Path(log_path / log_file_name)
 
     logger = logging.getLogger(caller_name)
     logger.setLevel(level)
-    logger.addFilter(NameFilter())
+    if not any(isinstance(each_filter, NameFilter) for each_filter in logger.filters):
+        logger.addFilter(NameFilter())
 
-    cl.install(logger=logger, level=level, fmt=console_log_format)
-    try:
-        logger.handlers[0].setLevel(level)
-    except IndexError:
-        pass
+    install_console_handler(logger, level=level, fmt=console_log_format)
 
+    log_file = None
     if log_to_file:
+        log_file = file_handler_pool.get(
+            log_full_path,
+            functools.partial(
+                build_file_handler,
+                async_file=async_file,
+                queue_policy=queue_policy,
+                shared=default_shared_file,
+            ),
+            (async_file, queue_policy),
+        )
+        if default_shared_file:
+            file_level_filter.set_level(caller_name, log_file_level)
+        else:
+            log_file.setLevel(log_file_level)
+
+    previous_file = logger_file_handlers.get(caller_name)
+    if previous_file is not None and previous_file is not log_file:
+        logger.removeHandler(previous_file)
+    if log_file is not None and log_file not in logger.handlers:
         logger.info(f"Logging to {log_full_path}")
-        log_file = logging.FileHandler(log_full_path)
-        log_file.setLevel(log_file_level)
-        log_file.setFormatter(log_formatter)
         logger.addHandler(log_file)
+    logger_file_handlers[caller_name] = log_file
+    logger_registry[caller_name] = (logger_config, logger)
 
-    for each_key, each_value in inspect.stack()[1].frame.f_locals.items():
+    for each_key, each_value in sys._getframe(1).f_locals.items():
         if isinstance(each_value, types.ModuleType):
             logger.getChild(each_key)
 
@@ -694,6 +2044,7 @@ def set_config(
     display_spacer: str = spacer,
     display_spacer_color: str = spacer_color,
     specific_logger_levels: dict = settings.specific_loggers,
+    console_color_mode: str = default_color_mode,
 ):
     """
     Sets default config
@@ -706,6 +2057,7 @@ def set_config(
     :param display_spacer:
     :param display_spacer_color:
     :param specific_logger_levels:
+    :param console_color_mode: auto, always or never
     :return:
     """
     global default_level
@@ -715,6 +2067,8 @@ def set_config(
     global default_log_ext
     global spacer
     global spacer_color
+    global default_color_mode
+    global plain_console
 
     level = ""
 
@@ -734,6 +2088,9 @@ def set_config(
         log_extension = log_extension[1:]
     if display_spacer_color.upper() not in valid_colors:
         display_spacer_color = spacer_color
+    if str(console_color_mode).lower() not in COLOR_MODES:
+        base_log.warning(f"Invalid color mode - {console_color_mode}")
+        console_color_mode = default_color_mode
 
     settings_write = {
         "logging_log_to_file": log_to_file,
@@ -745,6 +2102,7 @@ def set_config(
         "spacer": display_spacer,
         "spacer_color": display_spacer_color,
         "specific_loggers": specific_logger_levels,
+        "logging_color_mode": str(console_color_mode).lower(),
     }
 
     write_config(settings_write)
@@ -760,6 +2118,14 @@ def set_config(
     except AttributeError:
         logging.warning(f"Invalid color - {display_spacer_color}")
         spacer_color = cr.Fore.RED
+    default_color_mode = str(console_color_mode).lower()
+    plain_console = resolve_plain_console(default_color_mode)
+    clear_spacer_cache()
+    build_level_styles()
+    logger_registry.clear()
+    timer_loggers.clear()
+    module_timer_loggers.clear()
+    resolve_timer_level.cache_clear()
 
     for lkey in specific_loggers:
         if verify_level(specific_loggers.get(lkey)):
@@ -770,7 +2136,8 @@ def set_config(
                     f"Cannot set {key} to {specific_loggers.get(key)}")
 
 
-cr.init(autoreset=True)
+cr.init(autoreset=True, strip=False if default_color_mode == "always" else None)
+terminal.install()
 log_path = set_log_path()
 if not verify_level(default_level):
     default_level = "DEBUG"
@@ -784,8 +2151,8 @@ for name_filter in base_logger.filters:
 
 if not name_filter_added:
     base_logger.addFilter(NameFilter())
-    cl.install(
-        logger=base_logger,
+    install_console_handler(
+        base_logger,
         fmt=caller_log_format,
         field_styles=caller_color_format,
     )
@@ -797,8 +2164,8 @@ for format_filters in base_logger.filters:
 
 if not filter_added:
     base_logger.addFilter(CallerFilter())
-    cl.install(
-        logger=base_logger,
+    install_console_handler(
+        base_logger,
         fmt=caller_log_format,
         field_styles=caller_color_format,
     )
@@ -815,3 +2182,6 @@ for key in dict(specific_loggers):
             logging.getLogger(key).setLevel(specific_loggers.get(key))
         except ValueError:
             logging.warning(f"Cannot set {key} to {specific_loggers.get(key)}")
+
+if default_timer_calibrate:
+    calibrate_timer_overhead()
@@ -0,0 +1,220 @@
+"""Timer baselines across runs"""
+
+# *****************************************************************************
+#  MIT License                                                                *
+#                                                                             *
+#  Copyright (c) 2025 sshimek42                                               *
+#                                                                             *
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the "Software"), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#  The above copyright notice and this permission notice (including the next paragraph) shall be included in all copies or substantial portions of the Software.
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+# *****************************************************************************
+
+import argparse
+import json
+import os
+import sys
+from typing import NamedTuple
+
+from sclogging.timer_stats import format_duration
+
+BASELINE_VERSION = 1
+BASELINE_FIELDS = ("count", "mean", "p50", "p90", "p99", "p999")
+BASELINE_MIN_COUNT = 5
+REGRESSION_FIELDS = ("p50", "p99")
+REGRESSION_THRESHOLD = 0.2
+
+
+class Regression(NamedTuple):
+    """One percentile of one timer that got slower"""
+
+    name: str
+    field: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """Relative change, 0.5 is 50% slower"""
+        return self.current / self.baseline - 1 if self.baseline else float("inf")
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name} {self.field} {format_duration(self.baseline)} -> "
+            f"{format_duration(self.current)} (+{self.change:.0%})"
+        )
+
+
+def baseline_from_summaries(summaries: dict) -> dict:
+    """
+    Baseline data from timer_stats summaries
+
+    :param summaries: Name to summary from TimerStats.summaries
+    :return: Baseline with the duration fields of each timer
+    :rtype: dict
+    """
+    return {
+        "version": BASELINE_VERSION,
+        "timers": {
+            name: {
+                field: round(summary[field])
+                for field in BASELINE_FIELDS
+                if field in summary
+            }
+            for name, summary in summaries.items()
+            if summary.get("count")
+        },
+    }
+
+
+def load_baseline(path: str) -> dict:
+    """
+    Read a baseline file
+
+    :param path: Baseline file
+    :return: Baseline, empty if the file is missing, unreadable or another version
+    :rtype: dict
+    """
+    try:
+        with open(path, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(baseline, dict) or baseline.get("version") != BASELINE_VERSION:
+        return {}
+    return baseline
+
+
+def save_baseline(path: str, baseline: dict) -> None:
+    """
+    Write a baseline file, replacing the old one in one step
+
+    :param path: Baseline file
+    :param baseline: Baseline from baseline_from_summaries
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as baseline_file:
+        json.dump(baseline, baseline_file, separators=(",", ":"), sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def compare_baselines(
+    baseline: dict,
+    current: dict,
+    threshold: float = REGRESSION_THRESHOLD,
+    min_count: int = BASELINE_MIN_COUNT,
+) -> list[Regression]:
+    """
+    Timers whose p50 or p99 got slower than the threshold allows
+
+    Timers missing from either side or with fewer than min_count samples on
+    either side are skipped, and so are fields with a baseline of 0, which
+    have no relative change.
+
+    :param baseline: Older baseline
+    :param current: Newer baseline
+    :param threshold: Allowed relative slowdown, 0.2 is 20%
+    :param min_count: Samples needed on both sides
+    :return: Regressions
+    :rtype: list
+    """
+    regressions = []
+    baseline_timers = baseline.get("timers", {})
+    for name, current_values in current.get("timers", {}).items():
+        baseline_values = baseline_timers.get(name)
+        if baseline_values is None:
+            continue
+        count = min(baseline_values.get("count", 0), current_values.get("count", 0))
+        if count < min_count:
+            continue
+        for field in REGRESSION_FIELDS:
+            if not baseline_values.get(field) or field not in current_values:
+                continue
+            if current_values[field] > baseline_values[field] * (1 + threshold):
+                regressions.append(
+                    Regression(
+                        name, field, baseline_values[field], current_values[field]
+                    )
+                )
+    return regressions
+
+
+def format_diff(baseline: dict, current: dict) -> str:
+    """
+    Table of p50 and p99 changes of the timers in both baselines
+
+    :param baseline: Older baseline
+    :param current: Newer baseline
+    :return: One line per timer
+    :rtype: str
+    """
+    lines = []
+    baseline_timers = baseline.get("timers", {})
+    for name, current_values in sorted(current.get("timers", {}).items()):
+        baseline_values = baseline_timers.get(name)
+        if baseline_values is None:
+            lines.append(f"{name}: new")
+            continue
+        fields = []
+        for field in REGRESSION_FIELDS:
+            old_value = baseline_values.get(field)
+            new_value = current_values.get(field)
+            if old_value is None or new_value is None:
+                continue
+            change = f"{new_value / old_value - 1:+.0%}" if old_value else "n/a"
+            fields.append(
+                f"{field} {format_duration(old_value)} -> "
+                f"{format_duration(new_value)} ({change})"
+            )
+        lines.append(f"{name}: {', '.join(fields)}")
+    for name in sorted(set(baseline_timers) - set(current.get("timers", {}))):
+        lines.append(f"{name}: removed")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Compare two timer baseline files
+
+    :param argv: Arguments, defaults to sys.argv
+    :return: 1 if the newer file has regressions, else 0
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(
+        prog="sclogging-timer-diff",
+        description="Compare two SCLogging timer baseline files.",
+    )
+    parser.add_argument("baseline", help="Older baseline file")
+    parser.add_argument("current", help="Newer baseline file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="Allowed relative slowdown of p50 and p99 (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-count",
+        type=int,
+        default=BASELINE_MIN_COUNT,
+        help="Samples needed to compare a timer (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    current = load_baseline(args.current)
+    for path, data in ((args.baseline, baseline), (args.current, current)):
+        if not data:
+            print(f"Not a timer baseline file - {path}", file=sys.stderr)
+            return 2
+
+    print(format_diff(baseline, current))
+    regressions = compare_baselines(
+        baseline, current, args.threshold, args.min_count
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Span tree of nested timers"""
+
+# *****************************************************************************
+#  MIT License                                                                *
+#                                                                             *
+#  Copyright (c) 2025 sshimek42                                               *
+#                                                                             *
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the "Software"), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#  The above copyright notice and this permission notice (including the next paragraph) shall be included in all copies or substantial portions of the Software.
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+# *****************************************************************************
+
+from contextvars import ContextVar
+
+from sclogging.timer_stats import format_duration
+
+current_span = ContextVar("sclogging_current_span", default=None)
+
+
+class Span:
+    """One node of the timer tree
+
+    Children with the same name are merged into one node, so a timer that
+    runs in a loop adds one node, not one per iteration.
+    """
+
+    __slots__ = ("name", "parent", "children", "count", "total_ns", "child_ns")
+
+    def __init__(self, name: str, parent: "Span | None" = None) -> None:
+        self.name = name
+        self.parent = parent
+        self.children = None
+        self.count = 0
+        self.total_ns = 0
+        self.child_ns = 0
+
+    @property
+    def exclusive_ns(self) -> int:
+        """Time spent in this span outside of its children"""
+        return max(self.total_ns - self.child_ns, 0)
+
+
+def open_span(name: str) -> Span:
+    """
+    Enter a span under the current span of this thread or task
+
+    :param name: Span name
+    :return: Span
+    :rtype: Span
+    """
+    parent = current_span.get()
+    if parent is None:
+        span = Span(name)
+    else:
+        if parent.children is None:
+            parent.children = {}
+        span = parent.children.get(name)
+        if span is None:
+            span = parent.children[name] = Span(name, parent)
+    current_span.set(span)
+    return span
+
+
+def close_span(span: Span, duration_ns: int) -> Span | None:
+    """
+    Leave a span and add its duration
+
+    If children of the span were never stopped, the current span is unwound
+    past them to the parent, so they do not swallow later spans.
+
+    :param span: Span from open_span
+    :param duration_ns: Duration of this run of the span
+    :return: The span if it is a root, else None
+    :rtype: Span | None
+    """
+    span.count += 1
+    span.total_ns += duration_ns
+    running = current_span.get()
+    while running is not None:
+        if running is span:
+            current_span.set(span.parent)
+            break
+        running = running.parent
+    if span.parent is None:
+        return span
+    span.parent.child_ns += duration_ns
+    return None
+
+
+def format_span_tree(root: Span) -> str:
+    """
+    Indented tree of a root span with inclusive and exclusive times
+
+    :param root: Root span
+    :return: One line per span
+    :rtype: str
+    """
+    lines = []
+    stack = [(root, 0)]
+    while stack:
+        span, depth = stack.pop()
+        lines.append(
+            f"{'  ' * depth}{span.name or '-'} x{span.count} "
+            f"total={format_duration(span.total_ns)} "
+            f"self={format_duration(span.exclusive_ns)}"
+        )
+        if span.children:
+            stack.extend(
+                (child, depth + 1) for child in reversed(span.children.values())
+            )
+    return "\n".join(lines)
@@ -0,0 +1,321 @@
+"""Aggregated timer statistics"""
+
+# *****************************************************************************
+#  MIT License                                                                *
+#                                                                             *
+#  Copyright (c) 2025 sshimek42                                               *
+#                                                                             *
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the "Software"), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#  The above copyright notice and this permission notice (including the next paragraph) shall be included in all copies or substantial portions of the Software.
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+# *****************************************************************************
+
+import atexit
+import threading
+from array import array
+from typing import Callable
+
+HISTOGRAM_SUB_BUCKET_BITS = 7
+HISTOGRAM_MAX_VALUE = (1 << 43) - 1
+SUMMARY_PERCENTILES = (50, 90, 99, 99.9)
+METRIC_PERCENTILES = (50, 99)
+DURATION_UNITS = ((1_000_000_000, "s"), (1_000_000, "ms"), (1_000, "us"))
+
+
+def format_duration(nanoseconds: float) -> str:
+    """
+    Short human readable duration
+
+    :param nanoseconds: Duration in nanoseconds
+    :return: Duration with unit
+    :rtype: str
+    """
+    for scale, unit in DURATION_UNITS:
+        if nanoseconds >= scale:
+            return f"{nanoseconds / scale:.3f}{unit}"
+    return f"{nanoseconds:.0f}ns"
+
+
+def format_metric(metric: str, value: float) -> str:
+    """
+    Format a timer metric by the unit in its name
+
+    Names ending in _ns are durations, names ending in _bytes are sizes and
+    anything else is a count.
+
+    :param metric: Metric name
+    :param value: Value
+    :return: Formatted value
+    :rtype: str
+    """
+    if metric.endswith("_ns"):
+        return format_duration(value)
+    if metric.endswith("_bytes"):
+        sign = "-" if value < 0 else ""
+        value = abs(value)
+        for scale, unit in ((1 << 30, "GiB"), (1 << 20, "MiB"), (1 << 10, "KiB")):
+            if value >= scale:
+                return f"{sign}{value / scale:.1f}{unit}"
+        return f"{sign}{value:.0f}B"
+    return f"{value:g}"
+
+
+def format_metrics(metrics: dict) -> str:
+    """
+    One line of timer metrics
+
+    :param metrics: Metric name to value
+    :return: name=value pairs
+    :rtype: str
+    """
+    return " ".join(
+        f"{metric}={format_metric(metric, value)}" for metric, value in metrics.items()
+    )
+
+
+class LogLinearHistogram:
+    """Fixed size log-linear histogram of nanosecond durations
+
+    Values below 2**sub_bucket_bits are counted exactly. Above that, every
+    power of two is split into 2**(sub_bucket_bits - 1) linear buckets, so
+    the relative error stays under 2**-(sub_bucket_bits - 1). Memory does
+    not depend on the number of samples.
+    """
+
+    def __init__(
+        self,
+        sub_bucket_bits: int = HISTOGRAM_SUB_BUCKET_BITS,
+        max_value: int = HISTOGRAM_MAX_VALUE,
+    ) -> None:
+        self.sub_bucket_bits = sub_bucket_bits
+        self.half_count = 1 << (sub_bucket_bits - 1)
+        self.max_value = max_value
+        self.counts = array("Q", bytes(8 * (self.index_of(max_value) + 1)))
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def index_of(self, value: int) -> int:
+        """
+        Bucket index of a value
+
+        :param value: Value in nanoseconds
+        :return: Index into counts
+        :rtype: int
+        """
+        shift = value.bit_length() - self.sub_bucket_bits
+        if shift <= 0:
+            return value
+        return (shift * self.half_count) + (value >> shift)
+
+    def value_of(self, index: int) -> int:
+        """
+        Midpoint of the values counted in a bucket
+
+        :param index: Index into counts
+        :return: Value in nanoseconds
+        :rtype: int
+        """
+        if index < 2 * self.half_count:
+            return index
+        shift = index // self.half_count - 1
+        mantissa = index - shift * self.half_count
+        return (mantissa << shift) + (1 << shift) // 2
+
+    def record(self, value: int) -> None:
+        """
+        Count one value
+
+        :param value: Value in nanoseconds
+        """
+        if value < 0:
+            value = 0
+        elif value > self.max_value:
+            value = self.max_value
+        self.counts[self.index_of(value)] += 1
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def percentiles(self, percentiles: tuple = SUMMARY_PERCENTILES) -> dict:
+        """
+        Values at the given percentiles
+
+        :param percentiles: Percentiles between 0 and 100
+        :return: Percentile to value in nanoseconds
+        :rtype: dict
+        """
+        results = {}
+        if not self.count:
+            return results
+        targets = sorted(percentiles)
+        target_index = 0
+        needed = max(1, -(-self.count * targets[0] // 100))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            seen += bucket_count
+            while seen >= needed:
+                value = min(max(self.value_of(index), self.min), self.max)
+                results[targets[target_index]] = value
+                target_index += 1
+                if target_index == len(targets):
+                    return results
+                needed = max(1, -(-self.count * targets[target_index] // 100))
+        return results
+
+    def summary(self, percentiles: tuple = SUMMARY_PERCENTILES) -> dict:
+        """
+        Count, min, max, mean and percentiles
+
+        :param percentiles: Percentiles to include
+        :return: Summary values in nanoseconds
+        :rtype: dict
+        """
+        summary = {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else 0,
+        }
+        for percentile, value in self.percentiles(percentiles).items():
+            summary[f"p{percentile:g}".replace(".", "")] = value
+        return summary
+
+
+def format_summary(summary: dict) -> str:
+    """
+    One line summary of a timer
+
+    :param summary: Summary from LogLinearHistogram.summary
+    :return: Summary line
+    :rtype: str
+    """
+    fields = [f"count={summary['count']}"]
+    for key, value in summary.items():
+        if key not in ("count", "metrics"):
+            fields.append(f"{key}={format_duration(value)}")
+    for metric, metric_summary in summary.get("metrics", {}).items():
+        values = " ".join(
+            f"{key}={format_metric(metric, value)}"
+            for key, value in metric_summary.items()
+            if key != "count"
+        )
+        fields.append(f"{metric}[{values}]")
+    return " ".join(fields)
+
+
+class TimerStats:
+    """Histograms of timer durations by timer name
+
+    Summaries are emitted for names that got new samples, on an interval
+    from a background thread and once more at exit. Extra metrics recorded
+    with a duration, like CPU time, get a histogram of their own.
+    """
+
+    def __init__(self) -> None:
+        self.histograms = {}
+        self.metric_histograms = {}
+        self.reported = {}
+        self.emit = None
+        self.interval = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, name: str, duration_ns: int, metrics: dict | None = None) -> None:
+        """
+        Add a duration to the histogram of name
+
+        :param name: Timer name
+        :param duration_ns: Duration in nanoseconds
+        :param metrics: Extra metric name to value, negative values count as 0
+        """
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LogLinearHistogram()
+            histogram.record(duration_ns)
+            if metrics:
+                metric_histograms = self.metric_histograms.setdefault(name, {})
+                for metric, value in metrics.items():
+                    metric_histogram = metric_histograms.get(metric)
+                    if metric_histogram is None:
+                        metric_histogram = metric_histograms[metric] = (
+                            LogLinearHistogram()
+                        )
+                    metric_histogram.record(int(value))
+
+    def start(self, emit: Callable[[str, dict], None], interval: float) -> None:
+        """
+        Start emitting summaries
+
+        :param emit: Called with name and summary for each changed timer
+        :param interval: Seconds between summaries, 0 for exit only
+        """
+        with self._lock:
+            self.emit = emit
+            self.interval = interval
+            if self._thread is None and interval > 0:
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="sclogging-timer-stats", daemon=True
+                )
+                self._thread.start()
+        atexit.unregister(self.stop)
+        atexit.register(self.stop)
+
+    def _run(self) -> None:
+        """Summary thread loop"""
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def summaries(self, changed_only: bool = False) -> dict:
+        """
+        Summaries of all timers
+
+        :param changed_only: Only timers with samples since the last changed_only
+            call, which marks them as reported
+        :return: Name to summary
+        :rtype: dict
+        """
+        with self._lock:
+            summaries = {}
+            for name, histogram in self.histograms.items():
+                if changed_only:
+                    if self.reported.get(name) == histogram.count:
+                        continue
+                    self.reported[name] = histogram.count
+                summaries[name] = histogram.summary()
+                metric_histograms = self.metric_histograms.get(name)
+                if metric_histograms:
+                    summaries[name]["metrics"] = {
+                        metric: metric_histogram.summary(METRIC_PERCENTILES)
+                        for metric, metric_histogram in metric_histograms.items()
+                    }
+        return summaries
+
+    def flush(self) -> None:
+        """Emit summaries of timers that changed since the last flush"""
+        if self.emit is None:
+            return
+        for name, summary in self.summaries(changed_only=True).items():
+            self.emit(name, summary)
+
+    def stop(self) -> None:
+        """Stop the summary thread and emit a final summary"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+        self.flush()
+
+
+timer_stats = TimerStats()
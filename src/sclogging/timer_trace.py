@@ -0,0 +1,154 @@
+"""Chrome trace-event export of timers"""
+
+# *****************************************************************************
+#  MIT License                                                                *
+#                                                                             *
+#  Copyright (c) 2025 sshimek42                                               *
+#                                                                             *
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the "Software"), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#  The above copyright notice and this permission notice (including the next paragraph) shall be included in all copies or substantial portions of the Software.
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+# *****************************************************************************
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+
+TRACE_BATCH_SIZE = 512
+
+
+class TraceWriter:
+    """Streams timer spans to a Chrome trace-event JSON file
+
+    Each span is one complete ("X") event, so a file never holds half of a
+    span. The file uses the JSON array format, which trace viewers accept
+    without the closing bracket, so it can be opened while the process is
+    still running.
+
+    Events are queued by the caller and encoded and written by a background
+    thread. When the file reaches half of max_bytes it is moved to
+    <name>.prev.json and a new file is started, so the two files together
+    stay under max_bytes and hold the most recent events.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0) -> None:
+        self.path = path
+        self.previous_path = f"{path.removesuffix('.json')}.prev.json"
+        self.segment_bytes = max_bytes // 2
+        self.pid = os.getpid()
+        self.queue = queue.SimpleQueue()
+        self.written = 0
+        self.events_in_file = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="sclogging-trace", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add(
+        self, name: str, category: str, start_us: float, duration_us: float, args: dict
+    ) -> None:
+        """
+        Queue one span
+
+        :param name: Span name
+        :param category: Event category
+        :param start_us: Start timestamp in microseconds
+        :param duration_us: Duration in microseconds
+        :param args: Extra values shown with the event
+        """
+        self.queue.put(
+            (name, category, start_us, duration_us, threading.get_native_id(), args)
+        )
+
+    def _open(self) -> None:
+        """Start a new trace file"""
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write("[\n")
+        self.written = 2
+        self.events_in_file = 0
+
+    def _close_file(self) -> None:
+        """Close the JSON array and the current file"""
+        self._file.write("\n]\n")
+        self._file.close()
+        self._file = None
+
+    def _encode(self, event: tuple) -> str:
+        """Encode one queued span as a trace event"""
+        name, category, start_us, duration_us, tid, args = event
+        return json.dumps(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start_us,
+                "dur": duration_us,
+                "pid": self.pid,
+                "tid": tid,
+                "args": args,
+            },
+            separators=(",", ":"),
+        )
+
+    def _write(self, events: list) -> None:
+        """Write a batch of events, starting a new segment when full"""
+        if self._file is None:
+            self._open()
+        for event in events:
+            line = self._encode(event)
+            if (
+                self.segment_bytes
+                and self.events_in_file
+                and self.written + len(line) + 2 > self.segment_bytes
+            ):
+                self._close_file()
+                os.replace(self.path, self.previous_path)
+                self._open()
+            if self.events_in_file:
+                line = f",\n{line}"
+            self._file.write(line)
+            self.written += len(line)
+            self.events_in_file += 1
+        self._file.flush()
+
+    def _run(self) -> None:
+        """Writer thread loop"""
+        while True:
+            event = self.queue.get()
+            if event is None:
+                return
+            events = [event]
+            stop = False
+            while len(events) < TRACE_BATCH_SIZE:
+                try:
+                    event = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if event is None:
+                    stop = True
+                    break
+                events.append(event)
+            try:
+                self._write(events)
+            except OSError as error:
+                logging.getLogger(__name__).warning(
+                    f"Trace write failed - {error}")
+            if stop:
+                return
+
+    def close(self) -> None:
+        """Write queued events and close the file"""
+        with self._lock:
+            if not self._thread.is_alive():
+                return
+            self.queue.put(None)
+            self._thread.join()
+            if self._file is not None:
+                self._close_file()
+            atexit.unregister(self.close)
@@ -0,0 +1,124 @@
+"""Watchdog for timers that run past their deadline"""
+
+# *****************************************************************************
+#  MIT License                                                                *
+#                                                                             *
+#  Copyright (c) 2025 sshimek42                                               *
+#                                                                             *
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the "Software"), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#  The above copyright notice and this permission notice (including the next paragraph) shall be included in all copies or substantial portions of the Software.
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+# *****************************************************************************
+
+import heapq
+import itertools
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Callable
+
+
+class Watch:
+    """One running timer watched by the watchdog"""
+
+    __slots__ = ("deadline_ns", "start_ns", "thread_id", "payload", "active")
+
+    def __init__(
+        self, deadline_ns: int, start_ns: int, thread_id: int, payload: object
+    ) -> None:
+        self.deadline_ns = deadline_ns
+        self.start_ns = start_ns
+        self.thread_id = thread_id
+        self.payload = payload
+        self.active = True
+
+    def cancel(self) -> None:
+        """Stop watching, the entry is dropped when its deadline comes up"""
+        self.active = False
+
+
+def thread_stack(thread_id: int) -> str:
+    """
+    Current stack of a running thread
+
+    :param thread_id: threading.get_ident() of the thread
+    :return: Formatted stack, empty if the thread is gone
+    :rtype: str
+    """
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return ""
+    return "".join(traceback.format_stack(frame))
+
+
+class TimerWatchdog:
+    """Thread that reports timers still running after their deadline
+
+    Deadlines are kept in a heap. Each watch costs one push when it starts
+    and one pop when its deadline passes; a stopped timer is only marked
+    inactive. The thread sleeps until the nearest deadline and is only woken
+    early when a new watch becomes the nearest one.
+    """
+
+    def __init__(self, on_expired: Callable[[Watch, str], None]) -> None:
+        self.on_expired = on_expired
+        self.heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition(threading.Lock())
+        self._thread = None
+
+    def watch(self, start_ns: int, threshold_ns: int, payload: object) -> Watch:
+        """
+        Watch the calling thread until the returned watch is cancelled
+
+        :param start_ns: perf_counter_ns at the start of the timer
+        :param threshold_ns: Allowed run time in nanoseconds
+        :param payload: Passed back to on_expired
+        :return: Watch to cancel when the timer stops
+        :rtype: Watch
+        """
+        watch = Watch(
+            start_ns + threshold_ns, start_ns, threading.get_ident(), payload
+        )
+        with self._condition:
+            heapq.heappush(self.heap, (watch.deadline_ns, next(self._sequence), watch))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="sclogging-watchdog", daemon=True
+                )
+                self._thread.start()
+            elif self.heap[0][2] is watch:
+                self._condition.notify()
+        return watch
+
+    def after_fork(self) -> None:
+        """
+        Forget the parent's watches and thread in a forked child
+
+        The watched threads did not survive the fork. The next watch starts a
+        new watchdog thread.
+        """
+        self.heap = []
+        self._condition = threading.Condition(threading.Lock())
+        self._thread = None
+
+    def _run(self) -> None:
+        """Watchdog thread loop"""
+        while True:
+            with self._condition:
+                while not self.heap:
+                    self._condition.wait()
+                deadline_ns = self.heap[0][0]
+                wait_ns = deadline_ns - time.perf_counter_ns()
+                if wait_ns > 0:
+                    self._condition.wait(wait_ns / 1_000_000_000)
+                    continue
+                watch = heapq.heappop(self.heap)[2]
+            if watch.active:
+                try:
+                    self.on_expired(watch, thread_stack(watch.thread_id))
+                except Exception as error:
+                    logging.getLogger(__name__).warning(
+                        f"Watchdog report failed - {error}")
@@ -0,0 +1,9 @@
+"""Shared test setup"""
+
+import os
+import tempfile
+
+# Log files go to a scratch directory, set before sclogging reads its settings
+os.environ.setdefault(
+    "DYNACONF_LOGGING_PATH", tempfile.mkdtemp(prefix="sclogging-tests-")
+)
@@ -0,0 +1,62 @@
+"""get_logger memoization and reconfiguration"""
+
+import logging
+
+from sclogging.handlers import AsyncFileHandler, file_handler_of
+from sclogging.sclogging_main import get_logger
+
+
+def file_handlers(logger: logging.Logger) -> list:
+    """Handlers of logger that write a log file"""
+    return [
+        handler
+        for handler in logger.handlers
+        if hasattr(file_handler_of(handler), "baseFilename")
+    ]
+
+
+def test_repeated_calls_keep_handler_and_filter_counts():
+    logger = get_logger("repeat", log_to_file=True)
+    handler_count = len(logger.handlers)
+    filter_count = len(logger.filters)
+    root_handler_count = len(logging.getLogger().handlers)
+
+    for _ in range(10_000):
+        assert get_logger("repeat", log_to_file=True) is logger
+
+    assert len(logger.handlers) == handler_count
+    assert len(logger.filters) == filter_count
+    assert len(logging.getLogger().handlers) == root_handler_count
+    assert len(file_handlers(logger)) == 1
+
+
+def test_level_is_reapplied_after_reconfigure():
+    logger = get_logger("relevel", level="INFO")
+    get_logger("relevel", level="DEBUG")
+    assert logger.level == logging.DEBUG
+
+    get_logger("relevel", level="INFO")
+    assert logger.level == logging.INFO
+
+
+def test_file_handler_is_restored_after_reconfigure():
+    logger = get_logger("refile", log_to_file=True)
+    assert len(file_handlers(logger)) == 1
+
+    get_logger("refile", log_to_file=False)
+    assert file_handlers(logger) == []
+
+    get_logger("refile", log_to_file=True)
+    assert len(file_handlers(logger)) == 1
+
+
+def test_queue_policy_change_replaces_handler():
+    logger = get_logger("repolicy", log_to_file=True, async_file=True)
+    get_logger(
+        "repolicy", log_to_file=True, async_file=True, queue_policy="drop_newest"
+    )
+
+    handlers = [
+        handler for handler in logger.handlers if isinstance(handler, AsyncFileHandler)
+    ]
+    assert [handler.policy for handler in handlers] == ["drop_newest"]
@@ -0,0 +1,18 @@
+"""Style tag rendering"""
+
+import colorama as cr
+
+from sclogging.sclogging_main import render_style_markup
+
+
+def test_tagged_text_keeps_backslashes_and_tabs():
+    assert render_style_markup(r"%f.red%C:\temp\new%f%") == (
+        f"{cr.Fore.RED}C:\\temp\\new{cr.Fore.RESET}"
+    )
+    assert render_style_markup("%b.blue%a\tb%b% c\td") == (
+        f"{cr.Back.BLUE}a\tb{cr.Back.RESET} c\td"
+    )
+
+
+def test_unclosed_tag_is_left_as_text():
+    assert render_style_markup("%f.red%no close") == "%f.red%no close"
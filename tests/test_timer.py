@@ -0,0 +1,263 @@
+"""Timer loggers, per-record caller context and fork handling"""
+
+import gc
+import logging
+import os
+import signal
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+from sclogging.handlers import AsyncFileHandler, BatchFileHandler
+from sclogging import sclogging_main
+from sclogging.sclogging_main import Timer, resident_bytes, statm_fd
+
+needs_fork = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+
+
+class CapturingHandler(logging.Handler):
+    """Keeps the caller context of every record"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.seen = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.seen.append((record.threadName, record.timer_varname, record.timer_caller))
+
+
+class CountingHandler(logging.Handler):
+    """Counts records without keeping them"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.count += 1
+
+
+@pytest.fixture
+def timer_logger():
+    """Timer logger of this module, at DEBUG with its handlers swapped out"""
+    logger = Timer("INFO").timer_logger
+    saved = (logger.handlers[:], logger.level)
+    logger.setLevel(logging.DEBUG)
+    yield logger
+    logger.handlers[:], level = saved
+    logger.setLevel(level)
+
+
+def run_timers(count: int) -> None:
+    for _ in range(count):
+        soak_timer = Timer("INFO")
+        soak_timer.start_timer()
+        soak_timer.stop_timer()
+
+
+def test_many_timers_keep_logger_count_and_memory_flat(timer_logger):
+    counter = CountingHandler()
+    timer_logger.handlers[:] = [counter]
+    run_timers(1_000)
+    logger_count = len(logging.Logger.manager.loggerDict)
+    handler_count = len(timer_logger.handlers)
+
+    tracemalloc.start()
+    try:
+        # The first traced round can grow interpreter tables once
+        run_timers(10_000)
+        gc.collect()
+        baseline = tracemalloc.get_traced_memory()[0]
+        run_timers(10_000)
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+
+    assert counter.count == 2 * 21_000
+    assert len(logging.Logger.manager.loggerDict) == logger_count
+    assert len(timer_logger.handlers) == handler_count
+    assert growth < 64 * 1024
+
+
+def time_alpha() -> None:
+    alpha_timer = Timer("INFO")
+    for _ in range(100):
+        alpha_timer.start_timer()
+        alpha_timer.stop_timer()
+
+
+def time_beta() -> None:
+    beta_timer = Timer("INFO")
+    for _ in range(100):
+        beta_timer.start_timer()
+        beta_timer.stop_timer()
+
+
+def test_caller_context_is_per_record_across_threads(timer_logger):
+    capture = CapturingHandler()
+    timer_logger.handlers[:] = [capture]
+    threads = [
+        threading.Thread(
+            target=time_alpha if index % 2 else time_beta,
+            name=f"{'alpha' if index % 2 else 'beta'}-{index}",
+        )
+        for index in range(64)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(capture.seen) == 64 * 100 * 2
+    for thread_name, varname, caller in capture.seen:
+        function = thread_name.split("-")[0]
+        assert varname == f"{function}_timer"
+        assert caller.startswith(f"test_timer.time_{function}.")
+        assert caller.endswith(f".{function}_timer")
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "fork") or not os.path.exists("/proc/self/statm"),
+    reason="needs fork and /proc",
+)
+def test_rss_probe_reads_the_child_after_fork():
+    assert statm_fd() is not None
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        ballast = bytearray(128 * 1024 * 1024)
+        ballast[::4096] = b"x" * len(ballast[::4096])
+        with open("/proc/self/statm") as statm_file:
+            expected = int(statm_file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        os.write(write_end, f"{resident_bytes()} {expected}".encode())
+        os._exit(0)
+    os.close(write_end)
+    with os.fdopen(read_end) as result:
+        probed, expected = map(int, result.read().split())
+    os.waitpid(pid, 0)
+    assert abs(probed - expected) < 16 * 1024 * 1024
+
+
+def run_in_child(body) -> int:
+    """
+    Run body in a forked child that is killed after 10 seconds
+
+    :param body: Called in the child
+    :return: Exit code of the child, 1 if body raised, -SIGALRM if it hung
+    :rtype: int
+    """
+    pid = os.fork()
+    if pid == 0:
+        signal.alarm(10)
+        try:
+            body()
+        except BaseException:
+            os._exit(1)
+        os._exit(0)
+    return os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
+
+
+def file_logger(handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(f"test_timer.fork.{id(handler)}")
+    logger.propagate = False
+    logger.handlers[:] = [handler]
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+@needs_fork
+def test_async_file_handler_writes_in_a_forked_child(tmp_path):
+    path = tmp_path / "async.log"
+    handler = AsyncFileHandler(logging.FileHandler(path))
+    logger = file_logger(handler)
+    logger.info("parent record")
+    handler.flush()
+
+    def child():
+        logger.info("child record")
+        handler.flush()
+        handler.close()
+
+    try:
+        assert run_in_child(child) == 0
+    finally:
+        handler.close()
+    assert path.read_text().splitlines() == ["parent record", "child record"]
+
+
+@needs_fork
+def test_batch_file_handler_flushes_on_time_in_a_forked_child(tmp_path):
+    path = tmp_path / "batch.log"
+    handler = BatchFileHandler(path, batch_ms=20)
+    logger = file_logger(handler)
+    logger.info("parent record")
+    time.sleep(0.2)
+
+    def child():
+        logger.info("child record")
+        deadline = time.monotonic() + 2
+        while "child record" not in path.read_text():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    try:
+        assert run_in_child(child) == 0
+    finally:
+        handler.close()
+    assert path.read_text().splitlines() == ["parent record", "child record"]
+
+
+@needs_fork
+def test_trace_writer_is_reopened_in_a_forked_child():
+    parent_writer = sclogging_main.get_trace_writer()
+    read_end, write_end = os.pipe()
+
+    def child():
+        os.close(read_end)
+        writer = sclogging_main.get_trace_writer()
+        assert writer is not parent_writer
+        assert writer.pid == os.getpid()
+        writer.add("child span", "timer", 0, 1, {})
+        writer.close()
+        os.write(write_end, writer.path.encode())
+
+    try:
+        status = run_in_child(child)
+        os.close(write_end)
+        with os.fdopen(read_end) as result:
+            child_path = result.read()
+    finally:
+        parent_writer.close()
+        sclogging_main.trace_writer = None
+
+    assert status == 0
+    assert child_path != parent_writer.path
+    with open(child_path, encoding="utf-8") as trace_file:
+        assert '"name":"child span"' in trace_file.read()
+
+
+@needs_fork
+def test_watchdog_reports_in_a_forked_child():
+    watchdog = sclogging_main.timer_watchdog
+    expired = []
+    saved = watchdog.on_expired
+    watchdog.on_expired = lambda watch, stack: expired.append(watch.payload)
+    watchdog.watch(time.perf_counter_ns(), 60_000_000_000, "parent").cancel()
+
+    def child():
+        assert not expired
+        watchdog.watch(time.perf_counter_ns(), 10_000_000, "child")
+        deadline = time.monotonic() + 2
+        while not expired:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert expired == ["child"]
+
+    try:
+        assert run_in_child(child) == 0
+    finally:
+        watchdog.on_expired = saved
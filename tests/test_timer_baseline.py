@@ -0,0 +1,35 @@
+"""Timer baseline comparison"""
+
+import json
+
+import pytest
+
+from sclogging.timer_baseline import BASELINE_VERSION, compare_baselines, main
+
+
+def baseline(p50: int, p99: int, count: int = 100) -> dict:
+    return {
+        "version": BASELINE_VERSION,
+        "timers": {"load": {"count": count, "p50": p50, "p99": p99}},
+    }
+
+
+def test_slower_percentiles_are_regressions():
+    regressions = compare_baselines(baseline(100, 1000), baseline(130, 1100))
+    assert [each.field for each in regressions] == ["p50"]
+    assert regressions[0].change == pytest.approx(0.3)
+
+
+def test_zero_baseline_fields_are_skipped(tmp_path):
+    assert compare_baselines(baseline(0, 0), baseline(5, 5)) == []
+
+    paths = []
+    for name, data in (("old", baseline(0, 0)), ("new", baseline(5, 5))):
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps(data))
+        paths.append(str(path))
+    assert main(paths) == 0
+
+
+def test_timers_with_few_samples_are_skipped():
+    assert compare_baselines(baseline(100, 100, 2), baseline(500, 500, 2)) == []
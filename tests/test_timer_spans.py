@@ -0,0 +1,31 @@
+"""Span tree bookkeeping"""
+
+import pytest
+
+from sclogging.timer_spans import close_span, current_span, open_span
+
+
+@pytest.fixture(autouse=True)
+def empty_span_context():
+    """Start each test with no open span"""
+    token = current_span.set(None)
+    yield
+    current_span.reset(token)
+
+
+def test_unstopped_child_does_not_capture_later_roots():
+    for _ in range(3):
+        request = open_span("request")
+        open_span("db")  # returns early and is never closed
+        assert close_span(request, 100) is request
+        assert current_span.get() is None
+
+
+def test_child_closes_back_to_parent():
+    request = open_span("request")
+    db = open_span("db")
+    assert close_span(db, 40) is None
+    assert current_span.get() is request
+    assert close_span(request, 100) is request
+    assert request.child_ns == 40
+    assert request.exclusive_ns == 60